@@ -1,20 +1,32 @@
+import time
+
+# Taken before the other imports so time-to-first-paint includes them
+SCRIPT_STARTED = time.perf_counter()
+
 import streamlit as st
-from streamlit_gsheets import GSheetsConnection
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
-import altair as alt
+import numpy as np
 from datetime import datetime, timedelta
 import os
 import hmac
+import shutil
 from dotenv import load_dotenv
+from cachetools import LRUCache
 import calendar
-from dateutil import parser
-import subprocess
-import json
-import sys
+import contextlib
+import functools
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 import re
 
 load_dotenv()
 
+# Frames are shared read-only between sessions; with copy-on-write, anything
+# derived from them shares their buffers until it is actually modified
+pd.set_option("mode.copy_on_write", True)
+
 # =========== Page Config (MUST be first Streamlit call) ==========
 st.set_page_config(
     page_title="Linguistpd Dashboard",
@@ -23,17 +35,210 @@ st.set_page_config(
 )
 
 # =========== Sheet Connections ==========
-social_conn = st.connection("social_gsheets", type=GSheetsConnection)
-social_df = social_conn.read()
+# Every dashboard source: its st.connection name, the worksheet to read, how
+# many seconds a fetched copy is reused before going back to Google Sheets and
+# how long a read may take before the dashboard gives up on it.
+# Both can be overridden per source in .env, e.g. SALES_CACHE_TTL=60, EMAIL_LOAD_TIMEOUT=45
+DATA_SOURCES = {
+    "social": {"connection": "social_gsheets", "worksheet": None, "ttl": 900, "timeout": 30},
+    "sales": {"connection": "sales_gsheets", "worksheet": "Thinkifc orders updated by Zapier", "ttl": 300, "timeout": 30},
+    "wp_sales": {"connection": "wp_sales_gsheets", "worksheet": None, "ttl": 900, "timeout": 30},
+    "email": {"connection": "email_gsheets", "worksheet": None, "ttl": 900, "timeout": 30},
+}
+
+MAX_LOAD_WORKERS = int(os.getenv("MAX_LOAD_WORKERS", 4))
+
+
+def source_ttl(name):
+    return int(os.getenv(f"{name.upper()}_CACHE_TTL", DATA_SOURCES[name]["ttl"]))
+
+
+def source_timeout(name):
+    return float(os.getenv(f"{name.upper()}_LOAD_TIMEOUT", DATA_SOURCES[name]["timeout"]))
+
 
-sales_conn = st.connection("sales_gsheets", type=GSheetsConnection)
-sales_df = sales_conn.read(worksheet="Thinkifc orders updated by Zapier")
+@st.cache_resource
+def get_source_cache():
+    """Process-wide store of the last fetched DataFrame for each source."""
+    return {}
 
-wp_sales_conn = st.connection("wp_sales_gsheets", type=GSheetsConnection)
-wp_sales_df = wp_sales_conn.read()
 
-email_conn = st.connection("email_gsheets", type=GSheetsConnection)
-email_df = email_conn.read()
+def invalidate_sources(*names):
+    """Forget cached copies so the next load_sources() call re-reads the sheets."""
+    cache = get_source_cache()
+    for name in names or DATA_SOURCES:
+        cache.pop(name, None)
+
+
+# Drive files endpoint used to check whether a sheet changed since the last download.
+# Point DRIVE_FILES_URL at a local stand-in to exercise this without Google; the
+# stand-in is queried with a plain session, so no service account is needed.
+GOOGLE_DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
+DRIVE_FILES_URL = os.getenv("DRIVE_FILES_URL", GOOGLE_DRIVE_FILES_URL)
+DRIVE_METADATA_SCOPE = "https://www.googleapis.com/auth/drive.metadata.readonly"
+
+
+@st.cache_resource
+def get_download_stats():
+    """Process-wide counts of sheet downloads performed vs skipped because nothing changed."""
+    return {"lock": threading.Lock(), "downloaded": 0, "skipped": 0}
+
+
+def count_download(outcome):
+    stats = get_download_stats()
+    with stats["lock"]:
+        stats[outcome] += 1
+
+
+@st.cache_resource
+def get_drive_session(connection):
+    """
+    Session for Drive metadata requests: authorized with the connection's service
+    account, or a plain one when DRIVE_FILES_URL points at a stand-in.
+    None if neither applies.
+    """
+    if DRIVE_FILES_URL != GOOGLE_DRIVE_FILES_URL:
+        import requests
+
+        return requests.Session()
+
+    from google.oauth2 import service_account
+    from google.auth.transport.requests import AuthorizedSession
+
+    conn_secrets = dict(st.secrets.get("connections", {}).get(connection, {}))
+    if conn_secrets.get("type") != "service_account":
+        return None
+    credentials = service_account.Credentials.from_service_account_info(
+        conn_secrets, scopes=[DRIVE_METADATA_SCOPE]
+    )
+    return AuthorizedSession(credentials)
+
+
+def fetch_revision(name):
+    """
+    Return an identifier for the current revision of a source's spreadsheet,
+    built from Drive's version and modifiedTime.
+    Returns None when it can't be checked, in which case the sheet is always downloaded.
+    """
+    connection = DATA_SOURCES[name]["connection"]
+    spreadsheet = str(st.secrets.get("connections", {}).get(connection, {}).get("spreadsheet", ""))
+    match = re.search(r"/spreadsheets/d/([a-zA-Z0-9-_]+)", spreadsheet)
+    if not match:
+        return None
+    try:
+        session = get_drive_session(connection)
+        if session is None:
+            return None
+        response = session.get(
+            f"{DRIVE_FILES_URL}/{match.group(1)}",
+            params={"fields": "version,modifiedTime", "supportsAllDrives": "true"},
+            timeout=10,
+        )
+        response.raise_for_status()
+        meta = response.json()
+        return f"{meta.get('version', '')}/{meta.get('modifiedTime', '')}"
+    except Exception:
+        return None
+
+
+def fetch_source(name, conn):
+    """
+    Read one sheet and store the result in the source cache.
+    If Drive reports the same revision as the cached copy, the download is
+    skipped and the cached DataFrame is reused.
+    """
+    cache = get_source_cache()
+    entry = cache.get(name)
+    revision = fetch_revision(name)
+    if revision is not None and entry is not None and entry.get("revision") == revision:
+        count_download("skipped")
+        cache[name] = {**entry, "fetched_at": time.time()}
+        return entry["df"]
+
+    # ttl=0 skips the connector's own hour-long cache, freshness is decided here
+    df = conn.read(worksheet=DATA_SOURCES[name]["worksheet"], ttl=0)
+    count_download("downloaded")
+    cache[name] = {"df": df, "fetched_at": time.time(), "revision": revision}
+    sync_mirror(name, df, typed_frame(name, df))
+    return df
+
+
+@st.cache_resource
+def get_load_pool():
+    """
+    Process-wide pool that sheet reads run on, and the read in flight for each source.
+    Bounded, so a hung sheet holds on to one worker instead of new threads piling up.
+    """
+    return {
+        "executor": ThreadPoolExecutor(max_workers=MAX_LOAD_WORKERS, thread_name_prefix="load_sources"),
+        "lock": threading.Lock(),
+        "in_flight": {},
+    }
+
+
+def fetch_source_as(name, conn, ctx, today):
+    """fetch_source on a pool thread, with the calling script's context and reference date."""
+    add_script_run_ctx(threading.current_thread(), ctx)
+    # Workers parse dates while mirroring, so they use the caller's day
+    with pinned_reference_date(today):
+        return fetch_source(name, conn)
+
+
+def load_sources():
+    """
+    Return {source: DataFrame} for every source plus {source: error message}
+    for the ones that could not be refreshed.
+    Stale sources are read concurrently on the shared pool, so a cold load takes
+    as long as the slowest sheet. A source that fails or runs past its timeout
+    falls back to its last cached copy, or the local mirror if there is none.
+    A slow read keeps going in the background and lands in the cache for a
+    later rerun; until it finishes the source is not read again, and callers
+    get its last copy without waiting.
+    """
+    cache = get_source_cache()
+    frames, errors = {}, {}
+    stale = []
+    for name in DATA_SOURCES:
+        entry = cache.get(name)
+        if entry is not None and time.time() - entry["fetched_at"] <= source_ttl(name):
+            frames[name] = entry["df"]
+        else:
+            stale.append(name)
+
+    if not stale:
+        return frames, errors
+
+    from streamlit_gsheets import GSheetsConnection
+
+    pool = get_load_pool()
+    ctx = get_script_run_ctx()
+    today = reference_date()
+    started = time.monotonic()
+    futures = {}
+    with pool["lock"]:
+        for name in stale:
+            previous = pool["in_flight"].get(name)
+            if previous is not None and not previous.done():
+                errors[name] = "still loading from an earlier refresh"
+                continue
+            conn = st.connection(DATA_SOURCES[name]["connection"], type=GSheetsConnection)
+            futures[name] = pool["executor"].submit(fetch_source_as, name, conn, ctx, today)
+            pool["in_flight"][name] = futures[name]
+
+    for name, future in futures.items():
+        remaining = started + source_timeout(name) - time.monotonic()
+        try:
+            frames[name] = future.result(timeout=max(remaining, 0))
+        except FuturesTimeoutError:
+            errors[name] = f"timed out after {source_timeout(name):.0f}s"
+        except Exception as e:
+            errors[name] = str(e)
+
+    for name in errors:
+        entry = cache.get(name)
+        frames[name] = entry["df"] if entry is not None else read_mirror(name)
+    return frames, errors
+
 
 # =========== Password Check ==========
 def check_password():
@@ -62,9 +267,42 @@ def check_password():
         st.error("😕 Incorrect Admin Credentials")
     return False
 
+# =========== Reference Date ==========
+# "Today" for relative dates ("Today", "Tue 07:46"), yearless dates and the
+# future-date cutoff. It is read through reference_date() instead of being
+# fixed at import, and every cache built on parsed dates is keyed on it, so a
+# long-running server moves on to the new day at midnight without a restart.
+# A refresh pins the date for its whole run, so a build that straddles
+# midnight still uses a single day throughout. The pin is thread-local, so
+# load_sources re-pins the caller's date for each read on its pool threads.
+# Set REFERENCE_DATE=YYYY-MM-DD in .env to render the dashboard as of a fixed day.
+pinned_dates = threading.local()
+
+
+def reference_date():
+    pinned = getattr(pinned_dates, "today", None)
+    if pinned is not None:
+        return pinned
+    fixed = os.getenv("REFERENCE_DATE")
+    return datetime.strptime(fixed, "%Y-%m-%d").date() if fixed else datetime.now().date()
+
+
+@contextlib.contextmanager
+def pinned_reference_date(today):
+    """Make reference_date() return `today` on this thread until the block exits."""
+    previous = getattr(pinned_dates, "today", None)
+    pinned_dates.today = today
+    try:
+        yield today
+    finally:
+        pinned_dates.today = previous
+
+
 # =========== Date Parsing Functions ==========
 
-TODAY = datetime.now().date()
+MISSING = object()
+
+WEEKDAY_PREFIX = r'^(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)[,\s]+'
 
 def parse_social_date(date_str):
     """
@@ -77,6 +315,9 @@ def parse_social_date(date_str):
       - "5 March 2024"  (with year)
     Never returns a date beyond today.
     """
+    from dateutil import parser
+
+    today = reference_date()
     try:
         if pd.isna(date_str) or str(date_str).strip() == "":
             return None
@@ -86,22 +327,20 @@ def parse_social_date(date_str):
 
         # Relative keywords
         if lower.startswith("today"):
-            return TODAY
+            return today
         if lower.startswith("yesterday"):
-            return TODAY - timedelta(days=1)
+            return today - timedelta(days=1)
 
         # Strip leading weekday: "Tuesday, 12 August" -> "12 August"
-        s = re.sub(
-            r'^(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)[,\s]+',
-            '', s, flags=re.IGNORECASE
-        ).strip()
+        s = re.sub(WEEKDAY_PREFIX, '', s, flags=re.IGNORECASE).strip()
 
         # Try parsing with dateutil
-        parsed = parser.parse(s, dayfirst=True).date()
+        # Missing fields (usually the year) come from the reference date, not the wall clock
+        parsed = parser.parse(s, dayfirst=True, default=datetime.combine(today, datetime.min.time())).date()
 
-        # If the parsed date is in the future, dateutil picked the current year
+        # If the parsed date is in the future, dateutil picked the reference year
         # but the post hasn't happened yet — roll back one year
-        if parsed > TODAY:
+        if parsed > today:
             parsed = parsed.replace(year=parsed.year - 1)
 
         return parsed
@@ -111,6 +350,7 @@ def parse_social_date(date_str):
 
 def clean_wp_date(date_str):
     """Parse WordPress sales dates."""
+    today = reference_date()
     try:
         if pd.isna(date_str) or date_str == "":
             return None
@@ -119,7 +359,7 @@ def clean_wp_date(date_str):
             try:
                 result = pd.to_datetime(date_str)
                 # Reject future dates
-                if result.date() > TODAY:
+                if result.date() > today:
                     return None
                 return result
             except Exception:
@@ -129,11 +369,11 @@ def clean_wp_date(date_str):
                 date_part = parts[0] if len(parts[0].split('-')) == 3 else parts[1]
                 time_part = parts[-1] if ':' in parts[-1] else '00:00:00'
                 result = pd.to_datetime(f"{date_part} {time_part}")
-                if result.date() > TODAY:
+                if result.date() > today:
                     return None
                 return result
         result = pd.to_datetime(date_str)
-        if result.date() > TODAY:
+        if result.date() > today:
             return None
         return result
     except Exception:
@@ -142,6 +382,7 @@ def clean_wp_date(date_str):
 
 def parse_email_date(date_str):
     """Parse email date strings with various formats. Never returns a future date."""
+    today = reference_date()
     try:
         if pd.isna(date_str) or date_str == "":
             return None
@@ -149,173 +390,1220 @@ def parse_email_date(date_str):
         # Format like "Tue 07:46" — resolve to most recent occurrence of that weekday
         if isinstance(date_str, str) and len(date_str.split()) == 2 and ':' in date_str:
             day_abbr, time = date_str.split()
-            today_dt = datetime.now()
+            today_dt = datetime.combine(today, datetime.min.time())
             days_map = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6}
             if day_abbr in days_map:
                 days_diff = (today_dt.weekday() - days_map[day_abbr]) % 7
                 email_date = today_dt if days_diff == 0 else today_dt - timedelta(days=days_diff)
                 hour, minute = map(int, time.split(':'))
                 email_date = email_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                if email_date.date() > TODAY:
+                if email_date.date() > today:
                     return None
                 return email_date
 
         result = pd.to_datetime(date_str, dayfirst=True, errors='coerce')
         if pd.isna(result):
             return None
-        if result.date() > TODAY:
+        if result.date() > today:
             return None
         return result
     except Exception:
         return None
 
 
-# =========== Daily Data Prep Functions ==========
+# =========== Vectorized Date Parsing ==========
+# Column-at-a-time versions of the parsers above. Each known format is picked
+# out with a regex mask and built in one batch call; anything else (or a match
+# that doesn't form a valid date) goes through the row-wise parser, once per
+# distinct value, so results are identical to calling the parser per row.
+# All three return datetime64 Series with NaT where the row-wise parser returns None.
+
+MONTH_NUMBERS = {
+    name.lower(): i
+    for i in range(1, 13)
+    for name in (calendar.month_name[i], calendar.month_abbr[i])
+}
+MONTH_NUMBERS["sept"] = 9
+
+EMAIL_WEEKDAYS = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6}
+
+WP_STATUS_PREFIX = r'(?:(?:Published|Scheduled|Pending|Draft|Private)\s+)?'
+
+
+def assemble_dates(parts):
+    """Build timestamps from year/month/day(/hour/minute) columns; impossible dates become NaT."""
+    parts = parts.astype("float64")
+    parsed = pd.to_datetime(parts, errors="coerce")
+    # to_datetime rolls 25:00 over into the next day instead of rejecting it
+    if "hour" in parts:
+        parsed[(parts["hour"] > 23) | (parts["minute"] > 59)] = pd.NaT
+    return parsed
+
+
+def fallback_parse(values, parse):
+    """Row-wise parse for values no batch format handled, run once per distinct value."""
+    if values.empty:
+        return pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    parsed = {value: parse(value) for value in pd.unique(values)}
+    return pd.to_datetime(values.map(parsed).astype(object), errors="coerce")
+
+
+# Parsed values are memoized per distinct raw string in a bounded LRU shared
+# by every rerun and session. Keys include the reference date, and the cache
+# is emptied when it changes, so relative forms ("Today", "Tue 07:46") are
+# re-parsed on the new day.
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", 50_000))
+
+
+@st.cache_resource
+def get_parse_cache():
+    return {
+        "lock": threading.Lock(), "entries": LRUCache(maxsize=PARSE_CACHE_SIZE), "today": None,
+        "hits": 0, "misses": 0,
+    }
+
+
+def memoized_dates(parse_column):
+    """Run a column parser only on the distinct values the shared LRU hasn't seen today."""
+    @functools.wraps(parse_column)
+    def wrapper(dates):
+        today = reference_date()
+        codes, uniques = pd.factorize(dates)
+        keys = [(parse_column.__name__, today, value) for value in uniques]
+        cache = get_parse_cache()
+        # One slot per distinct value, plus a trailing NaT for missing values (code -1)
+        parsed = pd.Series(pd.NaT, index=range(len(uniques) + 1), dtype="datetime64[ns]")
+        with cache["lock"]:
+            if cache["today"] != today:
+                cache["entries"].clear()
+                cache["today"] = today
+            found = [cache["entries"].get(key, MISSING) for key in keys]
+        misses = [i for i, value in enumerate(found) if value is MISSING]
+        hits = [i for i, value in enumerate(found) if value is not MISSING]
+        parsed.iloc[hits] = [found[i] for i in hits]
+        if misses:
+            with pinned_reference_date(today):
+                fresh = parse_column(pd.Series(uniques.take(misses), dtype=object))
+            parsed.iloc[misses] = fresh.to_numpy()
+        with cache["lock"]:
+            for i in misses:
+                cache["entries"][keys[i]] = parsed.iloc[i]
+            cache["hits"] += len(hits)
+            cache["misses"] += len(misses)
+        return pd.Series(parsed.to_numpy()[codes], index=dates.index)
+    return wrapper
+
+
+@memoized_dates
+def parse_social_dates(dates):
+    """Vectorized parse_social_date."""
+    today = pd.Timestamp(reference_date())
+    text = dates.astype("string").str.strip()
+    lower = text.str.lower()
+    blank = (text.isna() | (text == "")).fillna(True).astype(bool)
+    is_today = lower.str.startswith("today").fillna(False).astype(bool)
+    is_yesterday = lower.str.startswith("yesterday").fillna(False).astype(bool) & ~is_today
+    rest = text.str.replace(WEEKDAY_PREFIX, "", regex=True, case=False).str.strip()
+
+    # "24/04/2023" (day first), "12 August [2024]", "August 12[, 2024]"
+    numeric = rest.str.extract(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+    day_month = rest.str.extract(r'^(\d{1,2})\s+([A-Za-z]+)(?:,?\s+(\d{4}))?$')
+    month_day = rest.str.extract(r'^([A-Za-z]+)\s+(\d{1,2})(?:,?\s+(\d{4}))?$')
+    named = (day_month[0].notna() | month_day[0].notna()).astype(bool)
+
+    parts = pd.DataFrame(index=dates.index)
+    parts["year"] = pd.to_numeric(numeric[2].fillna(day_month[2]).fillna(month_day[2])).astype("float64")
+    # Yearless dates take the current year, like dateutil's default
+    parts.loc[named & parts["year"].isna(), "year"] = today.year
+    parts["month"] = pd.to_numeric(numeric[1]).astype("float64").fillna(
+        day_month[1].fillna(month_day[0]).str.lower().map(MONTH_NUMBERS).astype("float64")
+    )
+    parts["day"] = pd.to_numeric(numeric[0].fillna(day_month[0]).fillna(month_day[1])).astype("float64")
+    parsed = assemble_dates(parts)
+
+    # A date in the future is from last year (29 Feb has no last-year equivalent)
+    future = (parsed > today) & ~is_today & ~is_yesterday
+    parts.loc[future, "year"] -= 1
+    parsed[future] = assemble_dates(parts[future])
+
+    parsed[is_today] = today
+    parsed[is_yesterday] = today - pd.Timedelta(days=1)
+    unmatched = parsed.isna() & ~future & ~blank
+    parsed[unmatched] = fallback_parse(dates[unmatched], parse_social_date)
+    return parsed
+
+
+@memoized_dates
+def clean_wp_dates(dates):
+    """Vectorized clean_wp_date."""
+    today = pd.Timestamp(reference_date())
+    text = dates.astype(object).where(dates.map(type) == str).str.split().str.join(" ")
+    blank = (dates.isna() | (dates == "") | (text == "")).astype(bool)
+
+    # "[Published] 2025/03/14 at 10:22", as scraped from the orders list
+    listed = text.str.extract(r'^' + WP_STATUS_PREFIX + r'(\d{4})/(\d{1,2})/(\d{1,2}) at (\d{1,2}):(\d{2})$')
+    listed.columns = ["year", "month", "day", "hour", "minute"]
+    parsed = assemble_dates(listed)
+    iso = text.str.fullmatch(r'\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2})?)?', na=False).astype(bool)
+    parsed[iso] = pd.to_datetime(text[iso], format="ISO8601", errors="coerce")
+
+    unmatched = parsed.isna() & ~blank
+    parsed[unmatched] = fallback_parse(dates[unmatched], clean_wp_date)
+    parsed[parsed.dt.normalize() > today] = pd.NaT
+    return parsed
+
+
+@memoized_dates
+def parse_email_dates(dates):
+    """Vectorized parse_email_date."""
+    today = pd.Timestamp(reference_date())
+    text = dates.astype(object).where(dates.map(type) == str)
+    blank = (dates.isna() | (dates == "")).astype(bool)
+
+    # "Tue 07:46" -> most recent Tuesday (today included) at that time
+    relative = text.str.extract(r'^\s*(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+([0-9]{1,2}):([0-9]{1,2})\s*$')
+    is_relative = relative[0].notna()
+    hours = pd.to_numeric(relative[1])
+    minutes = pd.to_numeric(relative[2])
+    valid_time = is_relative & (hours < 24) & (minutes < 60)
+    days_back = (today.weekday() - relative[0].map(EMAIL_WEEKDAYS)) % 7
+    parsed = (
+        today
+        - pd.to_timedelta(days_back, unit="D")
+        + pd.to_timedelta(hours, unit="h")
+        + pd.to_timedelta(minutes, unit="m")
+    ).where(valid_time)
+
+    # "09/02/2026 07:16" (day first)
+    numeric = text.str.extract(r'^(\d{1,2})/(\d{1,2})/(\d{4})(?:\s+(\d{1,2}):(\d{2}))?$')
+    numeric.columns = ["day", "month", "year", "hour", "minute"]
+    is_numeric = numeric["day"].notna()
+    parsed[is_numeric] = assemble_dates(numeric[is_numeric].fillna(0))
+
+    # An out-of-range time on a weekday stamp has no valid reading
+    unmatched = parsed.isna() & ~blank & ~(is_relative & ~valid_time)
+    parsed[unmatched] = fallback_parse(dates[unmatched], parse_email_date)
+    parsed[parsed.dt.normalize() > today] = pd.NaT
+    return parsed
+
+
+# =========== Local Mirror ==========
+# Every downloaded sheet is mirrored into a local Parquet store, one directory
+# per source, partitioned by month (_year=YYYY/_month=M, undated rows under 0/0)
+# and zstd-compressed. The prep and analysis functions read from the mirror via
+# DuckDB, so they keep working when Google Sheets is slow or unreachable.
+# Rows are stored as the sheet's text, so relative and yearless dates resolve
+# against the day they're read on; partitions come from the typed frame of the
+# download. The typed rows each sync writes are also held until the event store
+# takes them, so new rows aren't parsed again on their way into the events.
+MIRROR_DIR = os.getenv("MIRROR_DIR", ".mirror")
+
+
+@st.cache_resource
+def get_mirror_locks():
+    return {name: threading.Lock() for name in DATA_SOURCES}
+
+
+def mirror_path(name):
+    return os.path.join(MIRROR_DIR, name)
+
+
+def mirror_files(name):
+    path = mirror_path(name)
+    return sorted(
+        os.path.join(root, f)
+        for root, _, files in os.walk(path)
+        for f in files if f.endswith(".parquet")
+    )
 
-def prepare_daily_sales_data(df):
-    df_clean = df.copy()
-    df_clean["Date and Time"] = pd.to_datetime(df_clean["Date and Time"], errors="coerce")
-    df_clean = df_clean.dropna(subset=["Date and Time"])
-    df_clean = df_clean[df_clean["Date and Time"].dt.date <= TODAY]
-    df_clean["Year"] = df_clean["Date and Time"].dt.year
-    df_clean["Month"] = df_clean["Date and Time"].dt.month
-    df_clean["Day"] = df_clean["Date and Time"].dt.day
-    df_clean["Amount"] = pd.to_numeric(df_clean["Amount"], errors="coerce").fillna(0)
-    daily = df_clean.groupby(["Year", "Month", "Day"]).agg({"Amount": "sum"}).reset_index()
-    daily["Date"] = pd.to_datetime(daily[["Year", "Month", "Day"]])
-    return daily
 
+def mirror_version(name):
+    """Changes whenever a sync writes or rebuilds the source (new files get new uuids)."""
+    return hash(tuple(mirror_files(name)))
 
-def prepare_daily_wp_sales_data(df):
-    df_clean = df.copy()
-    df_clean["cleaned date"] = df_clean["Date"].apply(clean_wp_date)
-    df_clean = df_clean.dropna(subset=["cleaned date"])
-    df_clean["Total Amount"] = pd.to_numeric(df_clean["Total Amount"], errors="coerce").fillna(0)
-    df_clean["Year"] = df_clean["cleaned date"].dt.year
-    df_clean["Month"] = df_clean["cleaned date"].dt.month
-    df_clean["Day"] = df_clean["cleaned date"].dt.day
-    daily = df_clean.groupby(["Year", "Month", "Day"]).agg({"Total Amount": "sum"}).reset_index()
-    daily["Date"] = pd.to_datetime(daily[["Year", "Month", "Day"]])
-    return daily
 
+def mirror_glob(name):
+    return os.path.join(mirror_path(name), "*", "*", "*.parquet").replace("'", "''")
+
+
+@st.cache_resource
+def get_typed_parts():
+    """Per source, the typed rows of the part files each sync wrote, until the event store takes them."""
+    return {name: [] for name in DATA_SOURCES}
+
+
+def take_typed_parts(name, files, today):
+    """
+    Typed rows of exactly these part files, if syncs on this day stashed them all;
+    otherwise None and they have to be read back from the mirror. Call with the
+    source's mirror lock held. Stashed parts within files are dropped either way.
+    """
+    parts = get_typed_parts()[name]
+    taken = [part for part in parts if part["files"] <= files]
+    parts[:] = [part for part in parts if not part["files"] <= files]
+    stashed = frozenset().union(*(part["files"] for part in taken))
+    if not taken or stashed != files or any(part["today"] != today for part in taken):
+        return None
+    return pd.concat([part["rows"] for part in taken], ignore_index=True)
+
+
+def row_keys(rows):
+    """Hash of every row plus its occurrence number, so identical rows are still counted."""
+    keys = pd.DataFrame({"_row_hash": pd.util.hash_pandas_object(rows, index=False).to_numpy()})
+    keys["_row_occurrence"] = keys.groupby("_row_hash").cumcount().astype("int32")
+    return keys
+
+
+def write_mirror_rows(rows, path):
+    import duckdb
+
+    os.makedirs(MIRROR_DIR, exist_ok=True)
+    con = duckdb.connect()
+    con.register("new_rows", rows)
+    con.execute(
+        f"COPY new_rows TO '{path}' (FORMAT parquet, COMPRESSION zstd, "
+        "PARTITION_BY (_year, _month), FILENAME_PATTERN 'part_{uuid}', OVERWRITE_OR_IGNORE true)"
+    )
+    con.close()
+
+
+def sync_mirror(name, df, typed):
+    """
+    Mirror a freshly downloaded sheet, and its typed_frame, into the local store.
+    Rows that are already mirrored are skipped and only new ones appended.
+    If rows were edited or removed in the sheet (e.g. a full re-scrape) the
+    source is rebuilt from scratch instead. Returns the number of rows written.
+    """
+    # Store everything as text so the schema never changes between syncs
+    rows = df.astype("string")
+    rows.columns = [str(c) for c in rows.columns]
+    keys = row_keys(rows)
+    path = mirror_path(name)
+
+    with get_mirror_locks()[name]:
+        before = frozenset(mirror_files(name))
+        existing = mirror_keys(name)
+        key_index = pd.MultiIndex.from_frame(keys)
+        existing_index = pd.MultiIndex.from_frame(existing)
+        rebuild = not existing_index.isin(key_index).all()
+        new_mask = ~key_index.isin(existing_index) | rebuild
+        if not new_mask.any() and not rebuild:
+            return 0
+
+        new_rows = rows[new_mask].copy()
+        dates = column(typed, SHEET_DATE_COLUMNS[name], pd.NaT)[new_mask]
+        new_rows["_year"] = dates.dt.year.fillna(0).astype("int32").to_numpy()
+        new_rows["_month"] = dates.dt.month.fillna(0).astype("int32").to_numpy()
+        new_rows["_row_hash"] = keys["_row_hash"].to_numpy()[new_mask]
+        new_rows["_row_occurrence"] = keys["_row_occurrence"].to_numpy()[new_mask]
+
+        if rebuild:
+            staging = f"{path}.rebuild"
+            shutil.rmtree(staging, ignore_errors=True)
+            if len(new_rows):
+                write_mirror_rows(new_rows, staging)
+            shutil.rmtree(path, ignore_errors=True)
+            if os.path.exists(staging):
+                os.replace(staging, path)
+        else:
+            write_mirror_rows(new_rows, path)
+
+        parts = get_typed_parts()[name]
+        if rebuild:
+            parts.clear()
+        parts.append({
+            "files": frozenset(mirror_files(name)) - (frozenset() if rebuild else before),
+            "rows": typed[new_mask],
+            "today": reference_date(),
+        })
+    return len(new_rows)
+
+
+def mirror_keys(name):
+    if not mirror_files(name):
+        return pd.DataFrame({"_row_hash": pd.Series(dtype="uint64"), "_row_occurrence": pd.Series(dtype="int32")})
+    import duckdb
+
+    con = duckdb.connect()
+    keys = con.execute(
+        f"SELECT _row_hash, _row_occurrence FROM read_parquet('{mirror_glob(name)}', union_by_name = true)"
+    ).df()
+    con.close()
+    return keys
+
+
+def read_mirror_files(files):
+    """Mirrored rows from the given part files of a source."""
+    if not files:
+        return pd.DataFrame()
+    import duckdb
+
+    paths = ", ".join("'{}'".format(f.replace("'", "''")) for f in sorted(files))
+    con = duckdb.connect()
+    df = con.execute(
+        f"SELECT * EXCLUDE (_row_hash, _row_occurrence, _year, _month) "
+        f"FROM read_parquet([{paths}], hive_partitioning = true, union_by_name = true)"
+    ).df()
+    con.close()
+    return df
+
+
+@st.cache_resource(max_entries=len(DATA_SOURCES) * 2, show_spinner=False)
+def query_mirror(name, version):
+    """All mirrored rows of a source (cached per mirror version, shared by all sessions)."""
+    with get_mirror_locks()[name]:
+        return read_mirror_files(mirror_files(name))
+
+
+def read_mirror(name):
+    return query_mirror(name, mirror_version(name))
+
+
+# =========== Disk Memo ==========
+# Outputs of build_events and the prepare/analyze functions are kept as
+# Parquet files, keyed by a hash of their input frames, the reference date and
+# this file's source (so any code change starts a fresh set). They survive
+# restarts, so a warm start renders straight from disk without parsing.
+# The directory is capped at MEMO_MAX_MB; least recently used files go first.
+MEMO_DIR = os.getenv("MEMO_DIR", ".memo")
+
+MEMO_MAX_BYTES = int(os.getenv("MEMO_MAX_MB", 256)) * 1024 * 1024
+
+# List results (the analyze_* recommendations) are stored as a one-column frame
+MEMO_LIST_COLUMN = "_items"
+
+with open(__file__, "rb") as source_file:
+    CODE_VERSION = hashlib.sha256(source_file.read()).hexdigest()
+
+
+@st.cache_resource
+def get_memo_stats():
+    return {"lock": threading.Lock(), "hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+
+def count_memo(outcome, n=1):
+    stats = get_memo_stats()
+    with stats["lock"]:
+        stats[outcome] += n
+
+
+def update_digest(digest, value):
+    """Feed a frame (by content), a dict of frames or a plain value into a hash."""
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr((list(value.columns), [str(t) for t in value.dtypes])).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(repr(key).encode())
+            update_digest(digest, value[key])
+    else:
+        digest.update(repr(value).encode())
+
+
+def memo_files():
+    """(path, size, last used) of every memo file, least recently used first."""
+    try:
+        entries = [entry for entry in os.scandir(MEMO_DIR) if entry.name.endswith(".parquet")]
+    except FileNotFoundError:
+        return []
+    files = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((entry.path, stat.st_size, stat.st_mtime))
+    return sorted(files, key=lambda f: f[2])
+
+
+def evict_memo():
+    files = memo_files()
+    total = sum(size for _, size, _ in files)
+    for path, size, _ in files:
+        if total <= MEMO_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            count_memo("evictions")
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def disk_memo(function):
+    """Memoize a function of frames on disk (see above)."""
+    @functools.wraps(function)
+    def wrapper(*args):
+        digest = hashlib.sha256(f"{CODE_VERSION}/{function.__name__}/{reference_date()}".encode())
+        for arg in args:
+            update_digest(digest, arg)
+        path = os.path.join(MEMO_DIR, f"{digest.hexdigest()}.parquet")
+
+        try:
+            stored = pd.read_parquet(path)
+            # Mark it as recently used for eviction
+            os.utime(path)
+            count_memo("hits")
+            return list(stored[MEMO_LIST_COLUMN]) if list(stored.columns) == [MEMO_LIST_COLUMN] else stored
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # Unreadable (e.g. a write cut short by a crash); recompute and overwrite it
+            pass
+        count_memo("misses")
+
+        result = function(*args)
+        stored = pd.DataFrame({MEMO_LIST_COLUMN: result}) if isinstance(result, list) else result
+        try:
+            os.makedirs(MEMO_DIR, exist_ok=True)
+            partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            stored.to_parquet(partial, index=False, compression="zstd")
+            os.replace(partial, path)
+            count_memo("writes")
+            evict_memo()
+        except Exception:
+            # Memoizing is best effort, the result is still good
+            pass
+        return result
+    return wrapper
+
+
+# =========== Numeric Cleaning ==========
+# Amounts and engagement metrics arrive as typed into the sheets or scraped:
+# "£1,234.50", "$12", "1.2K", "3M", "4.5%", "no data available".
+# clean_numeric turns a column of them into floats using string-array
+# operations only. Currency symbols and thousands separators are dropped,
+# K/M scale by a thousand/million and percentages keep their percent value
+# ("4.5%" -> 4.5). Anything else that isn't a finite number ("no data
+# available", "n/a", "inf", "nan", ...) becomes 0 and is counted as coerced,
+# so one bad cell can't make a total infinite; blank cells are simply 0.
+NUMERIC_CELL = (
+    r'^(?P<sign>[-+])?\s*[£$€]?\s*(?P<inner_sign>[-+])?\s*'
+    r'(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?|\.\d+)\s*(?P<suffix>[kKmM%])?$'
+)
+
+NUMERIC_SUFFIXES = {"k": 1_000, "m": 1_000_000, "%": 1}
+
+
+def clean_numeric(values):
+    """Clean a column of numeric cells; returns (float64 values, mask of cells coerced to 0)."""
+    text = values.astype("string").str.strip()
+    blank = (text.isna() | (text == "")).astype(bool)
+    numbers = pd.to_numeric(text.where(~blank), errors="coerce").astype("float64")
+
+    # Only cells that aren't plain numbers go through the pattern
+    rest = numbers.isna() & ~blank
+    if rest.any():
+        parts = text[rest].str.extract(NUMERIC_CELL)
+        negative = parts["sign"].fillna(parts["inner_sign"]).eq("-").fillna(False).astype(bool)
+        number = pd.to_numeric(parts["number"].str.replace(",", "", regex=False), errors="coerce").astype("float64")
+        scale = parts["suffix"].str.lower().map(NUMERIC_SUFFIXES).astype("float64").fillna(1)
+        numbers[rest] = number * scale * negative.map({True: -1.0, False: 1.0})
+
+    numbers = numbers.where(np.isfinite(numbers))
+    coerced = numbers.isna() & ~blank
+    return numbers.fillna(0), coerced
+
+
+# =========== Sheet Schemas ==========
+# Each sheet is coerced once per load into compact dtypes: timestamps via the
+# source's date parser, money as float64, engagement counts as int32, other
+# metrics as float32, low-cardinality text as categoricals and all remaining
+# text as Arrow strings. Columns a sheet doesn't have are skipped.
+# typed_frame is the only place sheet values are parsed or cleaned: mirror
+# partitions and the event table are built from its output. COERCED_COLUMN
+# carries the number of each row's numeric cells clean_numeric turned into 0.
+# The typed frames are shared by every session and must never be written to;
+# derive new frames (assign, groupby, ...) instead. With copy-on-write on,
+# derived frames can't write through to them either.
+SHEET_SCHEMAS = {
+    "social": {
+        "Date": "timestamp", "Platform": "category",
+        "Likes/Reactions": "count", "Comments": "count", "Impressions": "count", "Shares": "count",
+        "Clicks/Eng. Rate": "metric", "Total Social Score": "metric",
+    },
+    "sales": {"Date and Time": "timestamp", "Amount": "money", "Product": "category"},
+    "wp_sales": {"Date": "timestamp", "Total Amount": "money", "Status": "category"},
+    "email": {"Date": "timestamp", "Sender": "category"},
+}
+
+SHEET_DATE_COLUMNS = {
+    name: next(column_name for column_name, kind in schema.items() if kind == "timestamp")
+    for name, schema in SHEET_SCHEMAS.items()
+}
+
+COERCED_COLUMN = "_coerced_cells"
+
+
+def sheet_dates(name, df):
+    """A sheet's timestamps, from its source's date parser."""
+    dates = df[SHEET_DATE_COLUMNS[name]]
+    if name == "sales":
+        return pd.to_datetime(dates, errors="coerce")
+    parsers = {"social": parse_social_dates, "wp_sales": clean_wp_dates, "email": parse_email_dates}
+    return parsers[name](dates)
+
+
+@disk_memo
+def typed_frame(name, df):
+    """A loaded sheet in the compact dtypes of its schema, plus its COERCED_COLUMN."""
+    import pyarrow as pa
+
+    schema = SHEET_SCHEMAS[name]
+    columns = {}
+    coerced_cells = np.zeros(len(df), dtype="int32")
+    for column_name in df.columns:
+        values = df[column_name]
+        kind = schema.get(column_name)
+        if kind in ("money", "metric", "count"):
+            numbers, coerced = clean_numeric(values)
+            coerced_cells += coerced.to_numpy(dtype="int32")
+        if kind == "timestamp":
+            columns[column_name] = sheet_dates(name, df)
+        elif kind == "money":
+            columns[column_name] = numbers
+        elif kind == "metric":
+            columns[column_name] = numbers.astype("float32")
+        elif kind == "count":
+            columns[column_name] = numbers.round().astype("int32")
+        elif kind == "category":
+            columns[column_name] = values.astype("string").astype("category")
+        elif values.dtype == object:
+            columns[column_name] = values.astype("string").astype(pd.ArrowDtype(pa.string()))
+        else:
+            columns[column_name] = values
+    columns[COERCED_COLUMN] = pd.Series(coerced_cells, index=df.index)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def memory_footprint(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def format_bytes(n):
+    return f"{n / 1024 / 1024:.1f} MB" if n >= 1024 * 1024 else f"{n / 1024:.0f} KB"
+
+
+# =========== Event Table ==========
+# Every source's typed frame is normalized into a single table, one row per
+# order, post or email. The rollup cube and analysis functions below are
+# derived from it.
+
+ENGAGEMENT_COLUMNS = {
+    "Likes/Reactions": "likes",
+    "Comments": "comments",
+    "Impressions": "impressions",
+    "Shares": "shares",
+    "Clicks/Eng. Rate": "clicks",
+}
+
+# coerced_cells counts the row's numeric cells that clean_numeric had to turn into 0 (see typed_frame)
+EVENT_COLUMNS = [
+    "source", "timestamp", "amount", *ENGAGEMENT_COLUMNS.values(), "coerced_cells",
+    "platform", "customer_email", "sender",
+]
+
+
+def column(df, name, default=None):
+    """A sheet column, or one filled with default (missing by default) if the sheet doesn't have it."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object if default is None else None)
+
+
+def text_column(df, name):
+    """A typed text or categorical column as plain objects, missing cells as None."""
+    values = column(df, name)
+    return values.astype(object).where(values.notna(), None)
+
+
+def concat_rows(frames):
+    """
+    Stack frames with the same columns, leaving out empty ones so they don't
+    take part in picking the result's dtypes; all empty gives the first one.
+    """
+    non_empty = [df for df in frames if not df.empty]
+    return pd.concat(non_empty, ignore_index=True) if non_empty else frames[0]
+
+
+@disk_memo
+def build_events(frames):
+    """
+    Normalize the four sources, as typed by typed_frame, into one table.
+    Rows with no usable date (or a future one) keep a NaT timestamp, so all-time
+    totals still count them while date-based rollups skip them.
+    """
+    today = pd.Timestamp(reference_date())
+    parts = []
+
+    sales = frames.get("sales", pd.DataFrame())
+    if not sales.empty:
+        # The other sources' date parsers already drop future dates
+        timestamps = column(sales, "Date and Time", pd.NaT)
+        parts.append(pd.DataFrame({
+            "source": "sales",
+            "timestamp": timestamps.where(timestamps.dt.normalize() <= today),
+            "amount": column(sales, "Amount", 0.0),
+            "coerced_cells": column(sales, COERCED_COLUMN, 0),
+            "customer_email": text_column(sales, "Email address"),
+        }))
+
+    wp_sales = frames.get("wp_sales", pd.DataFrame())
+    if not wp_sales.empty:
+        parts.append(pd.DataFrame({
+            "source": "wp_sales",
+            "timestamp": column(wp_sales, "Date", pd.NaT),
+            "amount": column(wp_sales, "Total Amount", 0.0),
+            "coerced_cells": column(wp_sales, COERCED_COLUMN, 0),
+            "customer_email": text_column(wp_sales, "Email"),
+        }))
+
+    social = frames.get("social", pd.DataFrame())
+    if not social.empty:
+        parts.append(pd.DataFrame({
+            "source": "social",
+            "timestamp": column(social, "Date", pd.NaT),
+            "platform": text_column(social, "Platform"),
+            **{
+                event_column: column(social, sheet_column, 0)
+                for sheet_column, event_column in ENGAGEMENT_COLUMNS.items()
+            },
+            "coerced_cells": column(social, COERCED_COLUMN, 0),
+        }))
+
+    email = frames.get("email", pd.DataFrame())
+    if not email.empty:
+        parts.append(pd.DataFrame({
+            "source": "email",
+            "timestamp": column(email, "Date", pd.NaT),
+            "sender": text_column(email, "Sender"),
+        }))
+
+    events = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    events = events.reindex(columns=EVENT_COLUMNS)
+    events["source"] = events["source"].astype(pd.CategoricalDtype(list(DATA_SOURCES)))
+    events["timestamp"] = pd.to_datetime(events["timestamp"])
+    for numeric_column in ["amount", *ENGAGEMENT_COLUMNS.values()]:
+        events[numeric_column] = events[numeric_column].astype("float64")
+    events["coerced_cells"] = events["coerced_cells"].fillna(0).astype("int32")
+    return events
+
+
+def source_events(events, source, dated=True):
+    rows = events[events["source"] == source]
+    return rows[rows["timestamp"].notna()] if dated else rows
+
+
+# =========== Customer Index ==========
+# Orders are keyed by a normalized email (trimmed, lower-cased, +tag dropped),
+# so "Jo@x.com ", "jo@x.com" and "jo+promo@x.com" are one customer. Per-source
+# order counts and totals are kept alongside the cube in the event store and
+# folded in as new orders arrive; the index is a frame keyed by that email, so
+# a customer lookup is a single hashed .loc.
+CUSTOMER_SOURCES = {"sales": "thinkific", "wp_sales": "webinar"}
+
+CUSTOMER_COLUMNS = [
+    "thinkific_orders", "thinkific_spent", "webinar_orders", "webinar_spent", "orders", "spent",
+]
+
+
+def normalize_emails(values):
+    emails = values.astype("string").str.strip().str.lower()
+    emails = emails.str.replace(r"\+[^@]*(?=@)", "", regex=True)
+    return emails.mask(emails == "")
+
+
+def customer_rollup(events):
+    """Order count and amount per normalized email and source."""
+    orders = events[events["source"].isin(list(CUSTOMER_SOURCES))]
+    orders = orders.assign(email=normalize_emails(orders["customer_email"]), orders=1)
+    orders = orders[orders["email"].notna()]
+    return orders.groupby(["email", "source"], observed=True)[["orders", "amount"]].sum().reset_index()
+
+
+def merge_customer_rollups(rollup, delta):
+    cells = concat_rows([rollup, delta])
+    return cells.groupby(["email", "source"], observed=True)[["orders", "amount"]].sum().reset_index()
+
+
+def customer_index(rollup):
+    """One row per customer, indexed by normalized email, biggest spenders first."""
+    emails = pd.Index(rollup["email"].unique(), name="email")
+    index = pd.DataFrame(index=emails)
+    for source, prefix in CUSTOMER_SOURCES.items():
+        cells = rollup[rollup["source"] == source].set_index("email")
+        index[f"{prefix}_orders"] = cells["orders"].reindex(emails, fill_value=0).astype("int32")
+        index[f"{prefix}_spent"] = cells["amount"].reindex(emails, fill_value=0.0).astype("float64")
+    index["orders"] = index["thinkific_orders"] + index["webinar_orders"]
+    index["spent"] = index["thinkific_spent"] + index["webinar_spent"]
+    return index.sort_values("spent", ascending=False, kind="stable")
+
+
+def find_customer(customers, email):
+    """A customer's row from the index, or None."""
+    key = normalize_emails(pd.Series([email])).iloc[0]
+    if pd.isna(key) or key not in customers.index:
+        return None
+    return customers.loc[key]
+
+
+# =========== Rollup Cube ==========
+# Day x source x platform sums of the event table; month and year views are
+# derived from it, so rendering never touches individual rows. Undated rows
+# roll up under a NaT day and only count towards all-time totals.
+# The event store keeps each source's events and cube cells together with the
+# mirror part files they were built from. New part files are parsed and folded
+# in as a delta, together with their customer rollup; a rebuilt mirror (files
+# gone) or a new day recomputes the source.
+CUBE_KEYS = ["day", "source", "platform"]
+
+CUBE_MEASURES = ["rows", "amount", *ENGAGEMENT_COLUMNS.values()]
 
-def prepare_daily_social_data(df):
-    df_clean = df.copy()
-    df_clean["Parsed_Date"] = df_clean["Date"].apply(parse_social_date)
-    df_clean = df_clean.dropna(subset=["Parsed_Date"])
-    # Enforce no-future-date cap (belt and braces)
-    df_clean = df_clean[df_clean["Parsed_Date"] <= TODAY]
-    df_clean["Parsed_Date"] = pd.to_datetime(df_clean["Parsed_Date"])
-    df_clean["Year"] = df_clean["Parsed_Date"].dt.year
-    df_clean["Month"] = df_clean["Parsed_Date"].dt.month
-    df_clean["Day"] = df_clean["Parsed_Date"].dt.day
-    df_clean["Post_Count"] = 1
-    daily = df_clean.groupby(["Year", "Month", "Day"]).agg({"Post_Count": "sum"}).reset_index()
-    daily["Total_Score"] = daily["Post_Count"]
-    daily["Date"] = pd.to_datetime(daily[["Year", "Month", "Day"]])
-    return daily
 
+def rollup_events(events):
+    cells = events.assign(
+        day=events["timestamp"].dt.normalize(), platform=events["platform"].fillna(""), rows=1
+    )
+    return cells.groupby(CUBE_KEYS, dropna=False, observed=True)[CUBE_MEASURES].sum().reset_index()
+
+
+def merge_rollups(cube, delta):
+    cells = concat_rows([cube, delta])
+    return cells.groupby(CUBE_KEYS, dropna=False, observed=True)[CUBE_MEASURES].sum().reset_index()
+
+
+@st.cache_resource
+def get_event_store():
+    return {
+        "lock": threading.Lock(), "today": None, "sources": {}, "events": None, "cube": None,
+        "customers": None, "year_partitions": None,
+    }
 
-def prepare_daily_email_data(df):
-    df_clean = df.copy()
-    df_clean["Parsed_Date"] = df_clean["Date"].apply(parse_email_date)
-    df_clean = df_clean.dropna(subset=["Parsed_Date"])
-    df_clean["Parsed_Date"] = pd.to_datetime(df_clean["Parsed_Date"])
-    df_clean = df_clean[df_clean["Parsed_Date"].dt.date <= TODAY]
-    df_clean["Year"] = df_clean["Parsed_Date"].dt.year
-    df_clean["Month"] = df_clean["Parsed_Date"].dt.month
-    df_clean["Day"] = df_clean["Parsed_Date"].dt.day
-    df_clean["Email_Count"] = 1
-    daily = df_clean.groupby(["Year", "Month", "Day"]).agg({"Email_Count": "sum"}).reset_index()
+
+def refresh_event_store(today):
+    """
+    Bring the event table, rollup cube and customer index up to date with the mirror.
+    Returns (events, cube, customers), shared by all sessions, so treat them as read-only.
+    """
+    store = get_event_store()
+    with store["lock"]:
+        if store["today"] != today:
+            store["sources"].clear()
+            store["today"] = today
+        changed = store["events"] is None
+        for name in DATA_SOURCES:
+            entry = store["sources"].get(name)
+            with get_mirror_locks()[name]:
+                files = frozenset(mirror_files(name))
+                if entry is not None and entry["files"] == files:
+                    continue
+                incremental = entry is not None and entry["files"] <= files
+                wanted = files - entry["files"] if incremental else files
+                typed = take_typed_parts(name, wanted, today)
+                rows = read_mirror_files(wanted) if typed is None else None
+
+            if typed is None:
+                typed = typed_frame(name, rows)
+            events = build_events({name: typed})
+            if incremental:
+                entry = {
+                    "files": files,
+                    "events": concat_rows([entry["events"], events]),
+                    "cube": merge_rollups(entry["cube"], rollup_events(events)),
+                    "customers": merge_customer_rollups(entry["customers"], customer_rollup(events)),
+                }
+            else:
+                entry = {
+                    "files": files, "events": events, "cube": rollup_events(events),
+                    "customers": customer_rollup(events),
+                }
+            store["sources"][name] = entry
+            changed = True
+
+        if changed:
+            sources = [store["sources"][name] for name in DATA_SOURCES]
+            store["events"] = concat_rows([entry["events"] for entry in sources])
+            store["cube"] = concat_rows([entry["cube"] for entry in sources])
+            store["customers"] = customer_index(concat_rows([entry["customers"] for entry in sources]))
+        return store["events"], store["cube"], store["customers"]
+
+
+def cube_cells(cube, source):
+    """Dated cube cells of one source."""
+    cells = cube[cube["source"] == source]
+    return cells[cells["day"].notna()]
+
+
+def social_score(rows):
+    """Engagement score used by the monthly social rollups (per post, or summed per cell)."""
+    return rows["comments"] + rows["impressions"] + rows["shares"] + rows["clicks"]
+
+
+def daily_rollup(cells, **aggregations):
+    days = cells["day"]
+    daily = cells.assign(
+        Year=days.dt.year, Month=days.dt.month, Day=days.dt.day
+    ).groupby(["Year", "Month", "Day"]).agg(**aggregations).reset_index()
     daily["Date"] = pd.to_datetime(daily[["Year", "Month", "Day"]])
     return daily
 
 
-# =========== Monthly Data Prep Functions (for analysis) ==========
-
-def prepare_sales_data(df):
-    df_clean = df.copy()
-    df_clean["Date and Time"] = pd.to_datetime(df_clean["Date and Time"], errors="coerce")
-    df_clean = df_clean.dropna(subset=["Date and Time"])
-    df_clean = df_clean[df_clean["Date and Time"].dt.date <= TODAY]
-    df_clean["Amount"] = pd.to_numeric(df_clean["Amount"], errors="coerce").fillna(0)
-    df_clean["Year"] = df_clean["Date and Time"].dt.year
-    df_clean["Month"] = df_clean["Date and Time"].dt.month
-    monthly = df_clean.groupby(["Year", "Month"]).agg({"Amount": "sum"}).reset_index()
+def monthly_rollup(cells, **aggregations):
+    days = cells["day"]
+    monthly = cells.assign(
+        Year=days.dt.year, Month=days.dt.month
+    ).groupby(["Year", "Month"]).agg(**aggregations).reset_index()
     monthly["Date"] = pd.to_datetime(monthly[["Year", "Month"]].assign(DAY=1))
     monthly["Month_Name"] = monthly["Month"].apply(lambda x: calendar.month_abbr[x])
     return monthly
 
 
-def prepare_wp_sales_data(df):
-    df_clean = df.copy()
-    df_clean["cleaned date"] = df_clean["Date"].apply(clean_wp_date)
-    df_clean = df_clean.dropna(subset=["cleaned date"])
-    df_clean["Total Amount"] = pd.to_numeric(df_clean["Total Amount"], errors="coerce").fillna(0)
-    df_clean["Year"] = df_clean["cleaned date"].dt.year
-    df_clean["Month"] = df_clean["cleaned date"].dt.month
-    monthly = df_clean.groupby(["Year", "Month"]).agg({"Total Amount": "sum"}).reset_index()
-    monthly["Date"] = pd.to_datetime(monthly[["Year", "Month"]].assign(DAY=1))
-    monthly["Month_Name"] = monthly["Month"].apply(lambda x: calendar.month_abbr[x])
-    return monthly
+def yearly_rollup(cells, **aggregations):
+    return cells.assign(Year=cells["day"].dt.year).groupby("Year").agg(**aggregations).reset_index()
 
 
-def prepare_social_data(df):
-    df_clean = df.copy()
-    df_clean["Parsed_Date"] = df_clean["Date"].apply(parse_social_date)
-    df_clean = df_clean.dropna(subset=["Parsed_Date"])
-    df_clean = df_clean[df_clean["Parsed_Date"] <= TODAY]
-    df_clean["Parsed_Date"] = pd.to_datetime(df_clean["Parsed_Date"])
-    df_clean["Year"] = df_clean["Parsed_Date"].dt.year
-    df_clean["Month"] = df_clean["Parsed_Date"].dt.month
-    engagement_columns = ["Comments", "Impressions", "Shares", "Clicks/Eng. Rate"]
-    for col in engagement_columns:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].astype(str).apply(
-                lambda x: 0 if "no data available" in x.lower() else x
-            )
-            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce').fillna(0)
-    available_eng = [c for c in engagement_columns if c in df_clean.columns]
-    df_clean["Total_Score"] = df_clean[available_eng].sum(axis=1) if available_eng else 0
-    monthly = df_clean.groupby(["Year", "Month"]).agg({"Total_Score": "sum"}).reset_index()
-    monthly["Date"] = pd.to_datetime(monthly[["Year", "Month"]].assign(DAY=1))
-    monthly["Month_Name"] = monthly["Month"].apply(lambda x: calendar.month_abbr[x])
-    return monthly
+# =========== Daily Data Prep Functions ==========
 
+@disk_memo
+def prepare_daily_sales_data(cube):
+    return daily_rollup(cube_cells(cube, "sales"), Amount=("amount", "sum"))
 
-def prepare_email_data(df):
-    df_clean = df.copy()
-    df_clean["Parsed_Date"] = df_clean["Date"].apply(parse_email_date)
-    df_clean = df_clean.dropna(subset=["Parsed_Date"])
-    df_clean["Parsed_Date"] = pd.to_datetime(df_clean["Parsed_Date"])
-    df_clean = df_clean[df_clean["Parsed_Date"].dt.date <= TODAY]
-    df_clean["Year"] = df_clean["Parsed_Date"].dt.year
-    df_clean["Month"] = df_clean["Parsed_Date"].dt.month
-    df_clean["Email_Count"] = 1
-    monthly = df_clean.groupby(["Year", "Month"]).agg({"Email_Count": "sum"}).reset_index()
-    monthly["Date"] = pd.to_datetime(monthly[["Year", "Month"]].assign(DAY=1))
-    monthly["Month_Name"] = monthly["Month"].apply(lambda x: calendar.month_abbr[x])
-    return monthly
+
+@disk_memo
+def prepare_daily_wp_sales_data(cube):
+    return daily_rollup(cube_cells(cube, "wp_sales"), **{"Total Amount": ("amount", "sum")})
+
+
+@disk_memo
+def prepare_daily_social_data(cube):
+    daily = daily_rollup(cube_cells(cube, "social"), Post_Count=("rows", "sum"))
+    daily.insert(4, "Total_Score", daily["Post_Count"])
+    return daily
+
+
+@disk_memo
+def prepare_daily_email_data(cube):
+    return daily_rollup(cube_cells(cube, "email"), Email_Count=("rows", "sum"))
+
+
+# =========== Monthly Data Prep Functions (for analysis) ==========
+
+@disk_memo
+def prepare_sales_data(cube):
+    return monthly_rollup(cube_cells(cube, "sales"), Amount=("amount", "sum"))
+
+
+@disk_memo
+def prepare_wp_sales_data(cube):
+    return monthly_rollup(cube_cells(cube, "wp_sales"), **{"Total Amount": ("amount", "sum")})
+
+
+@disk_memo
+def prepare_social_data(cube):
+    social = cube_cells(cube, "social")
+    return monthly_rollup(social.assign(Total_Score=social_score(social)), Total_Score=("Total_Score", "sum"))
+
+
+@disk_memo
+def prepare_email_data(cube):
+    return monthly_rollup(cube_cells(cube, "email"), Email_Count=("rows", "sum"))
+
+
+# =========== Yearly Data Prep Functions ==========
+
+@disk_memo
+def prepare_yearly_sales_data(cube):
+    return yearly_rollup(cube_cells(cube, "sales"), Amount=("amount", "sum"))
+
+
+@disk_memo
+def prepare_yearly_wp_sales_data(cube):
+    return yearly_rollup(cube_cells(cube, "wp_sales"), **{"Total Amount": ("amount", "sum")})
+
+
+# =========== Year Partitions ==========
+# The views behind the year selector are prepared and split by year once per
+# cube, so switching years is a dict lookup rather than a scan of every view.
+YEAR_VIEWS = {
+    "daily_sales": prepare_daily_sales_data,
+    "daily_wp_sales": prepare_daily_wp_sales_data,
+    "daily_social": prepare_daily_social_data,
+    "daily_email": prepare_daily_email_data,
+    "monthly_sales": prepare_sales_data,
+    "monthly_wp_sales": prepare_wp_sales_data,
+    "monthly_social": prepare_social_data,
+    "monthly_email": prepare_email_data,
+    "yearly_sales": prepare_yearly_sales_data,
+    "yearly_wp_sales": prepare_yearly_wp_sales_data,
+}
+
+
+def partition_by_year(views):
+    """
+    Split each view on its Year column: {year: {view name: rows}}.
+    Views with no rows in a year get an empty frame, which is also what is
+    returned (as the second value) for years that aren't in the data at all.
+    """
+    empty = {name: view.iloc[:0] for name, view in views.items()}
+    partitions = {}
+    for name, view in views.items():
+        for year, rows in view.groupby("Year", sort=True):
+            partitions.setdefault(int(year), dict(empty))[name] = rows
+    return partitions, empty
+
+
+def get_year_partitions(cube):
+    """Year partitions of the cube's views, built on first use after the cube changes."""
+    store = get_event_store()
+    with store["lock"]:
+        cached = store["year_partitions"]
+        if cached is None or cached[0] is not cube:
+            views = {name: prepare(cube) for name, prepare in YEAR_VIEWS.items()}
+            store["year_partitions"] = (cube, *partition_by_year(views))
+        return store["year_partitions"][1:]
+
+
+# =========== Chart Series ==========
+# The daily chart is sent one small Date/Value frame per series, split here
+# instead of filtered in the browser. A single year is at most 366 points per
+# series; longer ranges ("All years") are reduced to CHART_MAX_POINTS with
+# Largest-Triangle-Three-Buckets, which keeps the peaks and dips that plain
+# striding or averaging would flatten.
+ALL_YEARS = "All years"
+
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", 500))
+
+# Series: (year view, value column)
+CHART_SERIES = {
+    "Thinkific Sales": ("daily_sales", "Amount"),
+    "Webinar Sales": ("daily_wp_sales", "Total Amount"),
+    "Social Posts": ("daily_social", "Total_Score"),
+    "Emails Sent": ("daily_email", "Email_Count"),
+}
+
+
+def lttb_indices(xs, ys, threshold):
+    """Positions of the points LTTB keeps out of xs/ys (sorted by x)."""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # First and last points are always kept; the rest are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = [0]
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = xs[end:edges[i + 2]].mean(), ys[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = xs[-1], ys[-1]
+        # Keep the point forming the largest triangle with the last kept point and the next bucket's average
+        areas = np.abs(
+            (xs[previous] - next_x) * (ys[start:end] - ys[previous])
+            - (xs[previous] - xs[start:end]) * (next_y - ys[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected.append(previous)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def chart_series(year_views, max_points=CHART_MAX_POINTS):
+    """{series name: Date/Value frame} for the daily chart, at most max_points each."""
+    series = {}
+    for name, (view, value_column) in CHART_SERIES.items():
+        points = year_views[view][["Date", value_column]].rename(columns={value_column: "Value"})
+        points = points.sort_values("Date").reset_index(drop=True)
+        keep = lttb_indices(
+            points["Date"].to_numpy().astype("int64").astype("float64"),
+            points["Value"].to_numpy(dtype="float64"),
+            max_points,
+        )
+        series[name] = points.iloc[keep].reset_index(drop=True)
+    return series
+
+
+def all_years_views(year_partitions, empty_year):
+    """The year views over the whole history."""
+    if not year_partitions:
+        return empty_year
+    return {
+        name: pd.concat([views[name] for views in year_partitions.values()], ignore_index=True)
+        for name in empty_year
+    }
+
+
+# =========== Shared Snapshot ==========
+# Every session renders from one process-wide, read-only snapshot: the sheets
+# as loaded (in their schema's compact dtypes) plus the event table and year
+# partitions. A new version is built when a source or the event store changes
+# and swapped in with a single assignment, so a session never sees half of a
+# refresh. Sessions only keep their own UI state (login, selected year).
+
+@st.cache_resource
+def get_snapshot_store():
+    return {"lock": threading.Lock(), "current": None}
+
+
+def current_snapshot(source_frames):
+    """The snapshot for these source frames, reusing the current one if nothing changed."""
+    today = reference_date()
+    events, cube, customers = refresh_event_store(today)
+    store = get_snapshot_store()
+    with store["lock"]:
+        snapshot = store["current"]
+        if (
+            snapshot is None
+            or snapshot["events"] is not events
+            or any(snapshot["sources"][name] is not df for name, df in source_frames.items())
+        ):
+            year_partitions, empty_year = get_year_partitions(cube)
+            all_years = all_years_views(year_partitions, empty_year)
+            snapshot = {
+                "version": snapshot["version"] + 1 if snapshot is not None else 1,
+                "built_at": time.time(),
+                "today": today,
+                "sources": dict(source_frames),
+                "frames": {
+                    name: typed_frame(name, df).drop(columns=COERCED_COLUMN) for name, df in source_frames.items()
+                },
+                "events": events,
+                "year_partitions": year_partitions,
+                "empty_year": empty_year,
+                "all_years": all_years,
+                "chart_series": {
+                    year: chart_series(views)
+                    for year, views in [*year_partitions.items(), (ALL_YEARS, all_years)]
+                },
+                "customers": customers,
+                "metrics": create_performance_metrics(events, customers),
+                "coerced_cells": events.groupby("source", observed=False)["coerced_cells"].sum().to_dict(),
+            }
+            snapshot["footprint"] = {
+                name: (memory_footprint(source_frames[name]), memory_footprint(snapshot["frames"][name]))
+                for name in source_frames
+            }
+            store["current"] = snapshot
+        return snapshot
+
+
+# =========== Background Refresh ==========
+# Page loads never wait on Google Sheets: they render whatever snapshot is
+# current, and a background thread reloads stale sources (per their TTLs) and
+# publishes new snapshots. Only a cold start, with nothing to serve yet, loads
+# synchronously. A failed refresh leaves the last good snapshot in place.
+REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", 60))
+
+
+@st.cache_resource
+def get_refresher():
+    """Start the refresher thread (once per process) and return its state."""
+    refresher = {
+        "lock": threading.Lock(), "wake": threading.Event(),
+        "errors": {}, "last_error": None, "last_run": None, "as_of": None,
+    }
+    threading.Thread(target=run_refresher, args=(refresher,), name="data-refresher", daemon=True).start()
+    return refresher
+
+
+def refresh_snapshot(refresher):
+    """
+    One refresh cycle: reload stale sources and publish a new snapshot if
+    anything changed. Errors are recorded, never raised.
+    """
+    with refresher["lock"], pinned_reference_date(reference_date()):
+        try:
+            source_frames, source_errors = load_sources()
+            current_snapshot(source_frames)
+            refresher["errors"] = source_errors
+            refresher["last_error"] = None
+            fetched = [entry["fetched_at"] for entry in get_source_cache().values()]
+            if fetched:
+                refresher["as_of"] = min(fetched)
+        except Exception as e:
+            refresher["last_error"] = str(e)
+        refresher["last_run"] = time.time()
+
+
+def run_refresher(refresher):
+    while True:
+        refresher["wake"].wait(REFRESH_INTERVAL)
+        refresher["wake"].clear()
+        refresh_snapshot(refresher)
+
+
+# =========== Table Views ==========
+# The raw data tabs are filtered, sorted and paged here, and only the visible
+# page is sent to the browser. The row positions matching a filter and sort are
+# kept in a small LRU shared by every session, keyed by the snapshot version,
+# so flipping pages or switching tabs doesn't redo the work.
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
+
+TABLE_VIEW_CACHE_SIZE = int(os.getenv("TABLE_VIEW_CACHE_SIZE", 64))
+
+# Filterable columns per source
+TABLE_FILTERS = {
+    "sales": {"date": "Date and Time"},
+    "wp_sales": {"date": "Date"},
+    "social": {"date": "Date", "platform": "Platform"},
+    "email": {"date": "Date", "sender": "Sender"},
+}
+
+
+@st.cache_resource
+def get_table_view_cache():
+    return {"lock": threading.Lock(), "entries": LRUCache(maxsize=TABLE_VIEW_CACHE_SIZE)}
+
+
+def text_matches(values, text):
+    """Case-insensitive substring match; categoricals are matched once per category."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        matching = values.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        return values.cat.codes.isin(np.flatnonzero(matching)).to_numpy()
+    return values.astype("string").str.contains(text, case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+
+
+def table_rows(version, name, df, dates=None, platforms=(), sender="", sort_column=None, ascending=True):
+    """Positions of the rows of df passing the filters, in display order."""
+    key = (version, name, dates, tuple(platforms), sender, sort_column, ascending)
+    cache = get_table_view_cache()
+    with cache["lock"]:
+        if key in cache["entries"]:
+            return cache["entries"][key]
+
+    filters = TABLE_FILTERS.get(name, {})
+    mask = np.ones(len(df), dtype=bool)
+    if dates and filters.get("date") in df.columns:
+        days = df[filters["date"]].dt.normalize()
+        mask &= (days >= pd.Timestamp(dates[0])).to_numpy() & (days <= pd.Timestamp(dates[1])).to_numpy()
+    if platforms and filters.get("platform") in df.columns:
+        mask &= df[filters["platform"]].isin(platforms).to_numpy()
+    if sender and filters.get("sender") in df.columns:
+        mask &= text_matches(df[filters["sender"]], sender)
+
+    rows = np.flatnonzero(mask)
+    if sort_column in df.columns:
+        order = df[sort_column].iloc[rows].reset_index(drop=True).sort_values(
+            ascending=ascending, kind="stable", na_position="last"
+        ).index.to_numpy()
+        rows = rows[order]
+
+    with cache["lock"]:
+        cache["entries"][key] = rows
+    return rows
 
 
 # =========== Analysis Functions ==========
 
-def analyze_best_posting_times(social_df, sales_df, wp_sales_df):
+@disk_memo
+def analyze_best_posting_times(cube):
     recommendations = []
     try:
-        social_df_clean = social_df.copy()
-        social_df_clean["Parsed_Date"] = social_df_clean["Date"].apply(parse_social_date)
-        social_df_clean = social_df_clean.dropna(subset=["Parsed_Date"])
-        social_df_clean = social_df_clean[social_df_clean["Parsed_Date"] <= TODAY]
-        social_df_clean["Parsed_Date"] = pd.to_datetime(social_df_clean["Parsed_Date"])
-        social_df_clean["Month"] = social_df_clean["Parsed_Date"].dt.month
-        engagement_columns = ["Comments", "Impressions", "Shares", "Clicks/Eng. Rate"]
-        for col in engagement_columns:
-            if col in social_df_clean.columns:
-                social_df_clean[col] = pd.to_numeric(social_df_clean[col], errors='coerce').fillna(0)
-        available_eng = [c for c in engagement_columns if c in social_df_clean.columns]
-        social_df_clean["Total_Score"] = social_df_clean[available_eng].sum(axis=1) if available_eng else 0
-        monthly_social = social_df_clean.groupby("Month").agg({"Total_Score": "mean"}).reset_index()
+        social = cube_cells(cube, "social")
+        monthly_social = social.assign(
+            Month=social["day"].dt.month, Total_Score=social_score(social)
+        ).groupby("Month").agg({"Total_Score": "sum", "rows": "sum"}).reset_index()
+        monthly_social["Total_Score"] = monthly_social["Total_Score"] / monthly_social["rows"]
         if not monthly_social.empty:
             best_social_month = monthly_social.loc[monthly_social["Total_Score"].idxmax(), "Month"]
             recommendations.append(f"Best social media month: {calendar.month_name[best_social_month]} (highest engagement)")
@@ -323,21 +1611,10 @@ def analyze_best_posting_times(social_df, sales_df, wp_sales_df):
         recommendations.append("Social media data analysis unavailable")
 
     try:
-        sales_df_clean = sales_df.copy()
-        wp_sales_df_clean = wp_sales_df.copy()
-        sales_df_clean["Date"] = pd.to_datetime(sales_df_clean["Date and Time"], errors="coerce")
-        wp_sales_df_clean["cleaned date"] = wp_sales_df_clean["Date"].apply(clean_wp_date)
-        sales_df_clean = sales_df_clean.dropna(subset=["Date"])
-        wp_sales_df_clean = wp_sales_df_clean.dropna(subset=["cleaned date"])
-        sales_df_clean["Amount"] = pd.to_numeric(sales_df_clean["Amount"], errors="coerce").fillna(0)
-        wp_sales_df_clean["Total Amount"] = pd.to_numeric(wp_sales_df_clean["Total Amount"], errors="coerce").fillna(0)
-        all_sales = pd.concat([
-            sales_df_clean[["Date", "Amount"]].rename(columns={"Amount": "Value"}),
-            wp_sales_df_clean[["cleaned date", "Total Amount"]].rename(columns={"cleaned date": "Date", "Total Amount": "Value"})
-        ])
-        all_sales = all_sales.dropna(subset=["Date"])
-        all_sales["Month"] = all_sales["Date"].dt.month
-        monthly_sales = all_sales.groupby("Month").agg({"Value": "sum"}).reset_index()
+        all_sales = pd.concat([cube_cells(cube, "sales"), cube_cells(cube, "wp_sales")])
+        monthly_sales = all_sales.assign(
+            Month=all_sales["day"].dt.month
+        ).groupby("Month").agg(Value=("amount", "sum")).reset_index()
         if not monthly_sales.empty:
             best_sales_month = monthly_sales.loc[monthly_sales["Value"].idxmax(), "Month"]
             recommendations.append(f"Best sales month: {calendar.month_name[best_sales_month]} (highest revenue)")
@@ -345,8 +1622,8 @@ def analyze_best_posting_times(social_df, sales_df, wp_sales_df):
         recommendations.append("Sales pattern analysis unavailable")
 
     try:
-        monthly_social_agg = prepare_social_data(social_df)
-        monthly_sales_agg = prepare_sales_data(sales_df)
+        monthly_social_agg = prepare_social_data(cube)
+        monthly_sales_agg = prepare_sales_data(cube)
         merged_data = monthly_social_agg.merge(
             monthly_sales_agg[["Year", "Month", "Amount"]],
             on=["Year", "Month"], how="inner"
@@ -365,31 +1642,24 @@ def analyze_best_posting_times(social_df, sales_df, wp_sales_df):
     return recommendations
 
 
-def analyze_cross_platform_performance(social_df):
-    if social_df.empty:
+@disk_memo
+def analyze_cross_platform_performance(events):
+    social = source_events(events, "social", dated=False)
+    if social.empty:
         return pd.DataFrame()
-    df_clean = social_df.copy()
-    engagement_columns = ["Likes/Reactions", "Comments", "Impressions", "Shares", "Clicks/Eng. Rate"]
-    for col in engagement_columns:
-        if col in df_clean.columns:
-            df_clean[col] = df_clean[col].astype(str).apply(
-                lambda x: 0 if "no data available" in x.lower() or x.lower() == "nan" or x == "" else x
-            )
-            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce').fillna(0)
-    if 'Platform' not in df_clean.columns:
-        df_clean['Platform'] = 'unknown'
-    else:
-        df_clean['Platform'] = df_clean['Platform'].fillna('unknown').str.lower()
-    available = [c for c in ['Likes/Reactions', 'Comments', 'Impressions'] if c in df_clean.columns]
-    df_clean['Total_Score'] = df_clean[available].sum(axis=1) if available else 0
-    agg_cols = {c: 'mean' for c in ['Likes/Reactions', 'Comments', 'Impressions'] if c in df_clean.columns}
-    agg_cols['Total_Score'] = ['mean', 'max', 'count']
-    platform_performance = df_clean.groupby('Platform').agg(agg_cols).round(2)
-    platform_performance.columns = ['_'.join(col).strip() for col in platform_performance.columns.values]
+    df_clean = social.rename(columns={v: k for k, v in ENGAGEMENT_COLUMNS.items()})
+    df_clean = df_clean.assign(Platform=df_clean["platform"].fillna("unknown").str.lower())
+    score_columns = ["Likes/Reactions", "Comments", "Impressions"]
+    df_clean["Total_Score"] = df_clean[score_columns].sum(axis=1)
+    agg_cols = {c: "mean" for c in score_columns}
+    agg_cols["Total_Score"] = ["mean", "max", "count"]
+    platform_performance = df_clean.groupby("Platform").agg(agg_cols).round(2)
+    platform_performance.columns = ["_".join(col).strip() for col in platform_performance.columns.values]
     platform_performance = platform_performance.reset_index()
     return platform_performance
 
 
+@disk_memo
 def analyze_email_sales_correlation(daily_email, daily_sales, daily_wp_sales):
     recommendations = []
     try:
@@ -427,6 +1697,7 @@ def analyze_email_sales_correlation(daily_email, daily_sales, daily_wp_sales):
     return recommendations
 
 
+@disk_memo
 def analyze_seasonal_trends(monthly_social, monthly_sales, monthly_wp_sales):
     recommendations = []
     try:
@@ -450,34 +1721,25 @@ def analyze_seasonal_trends(monthly_social, monthly_sales, monthly_wp_sales):
     return recommendations
 
 
-def create_performance_metrics(sales_df, wp_sales_df, social_df, email_df):
+def create_performance_metrics(events, customers):
     metrics = {}
     try:
-        if "Amount" in sales_df.columns:
-            sales_df["Amount"] = pd.to_numeric(sales_df["Amount"], errors='coerce').fillna(0)
-            thinkific_sales = sales_df["Amount"].sum()
-        else:
-            thinkific_sales = 0
-        if "Total Amount" in wp_sales_df.columns:
-            wp_sales_df["Total Amount"] = pd.to_numeric(wp_sales_df["Total Amount"], errors='coerce').fillna(0)
-            webinar_sales = wp_sales_df["Total Amount"].sum()
-        else:
-            webinar_sales = 0
+        sales = source_events(events, "sales", dated=False)
+        wp_sales = source_events(events, "wp_sales", dated=False)
+        social = source_events(events, "social", dated=False)
+        email = source_events(events, "email", dated=False)
+        thinkific_sales = sales["amount"].sum()
+        webinar_sales = wp_sales["amount"].sum()
         metrics["total_revenue"] = thinkific_sales + webinar_sales
         metrics["thinkific_revenue"] = thinkific_sales
         metrics["webinar_revenue"] = webinar_sales
-        if not social_df.empty:
-            metrics["total_posts"] = len(social_df)
-            metrics["platform_diversity"] = social_df['Platform'].nunique() if 'Platform' in social_df.columns else 0
-        if not email_df.empty:
-            metrics["total_emails"] = len(email_df)
-            if 'Sender' in email_df.columns:
-                metrics["training_emails"] = len(email_df[email_df['Sender'].str.contains('training', case=False, na=False)])
-            else:
-                metrics["training_emails"] = 0
-        valid_sales = len(sales_df[sales_df["Amount"].notna()]) if "Amount" in sales_df.columns else 0
-        valid_wp_sales = len(wp_sales_df[wp_sales_df["Total Amount"].notna()]) if "Total Amount" in wp_sales_df.columns else 0
-        metrics["total_customers"] = valid_sales + valid_wp_sales
+        if not social.empty:
+            metrics["total_posts"] = len(social)
+            metrics["platform_diversity"] = social["platform"].nunique()
+        if not email.empty:
+            metrics["total_emails"] = len(email)
+            metrics["training_emails"] = int(email["sender"].str.contains("training", case=False, na=False).sum())
+        metrics["total_customers"] = len(customers)
     except Exception as e:
         st.error(f"Error calculating metrics: {e}")
         metrics = {
@@ -492,173 +1754,297 @@ def create_performance_metrics(sales_df, wp_sales_df, social_df, email_df):
 st.logo("lpd-logo.png", size="large")
 st.title("Linguistpd Admin Dashboard")
 
-# ====================== Daily Graph Setup =====================
-try:
-    daily_sales = prepare_daily_sales_data(sales_df)
-    daily_wp_sales = prepare_daily_wp_sales_data(wp_sales_df)
-    daily_social = prepare_daily_social_data(social_df)
-    daily_email = prepare_daily_email_data(email_df)
-
-    monthly_sales = prepare_sales_data(sales_df)
-    monthly_wp_sales = prepare_wp_sales_data(wp_sales_df)
-    monthly_social = prepare_social_data(social_df)
-    monthly_email = prepare_email_data(email_df)
-
-    available_years = sorted(
-        set(daily_sales["Year"].unique())
-        .union(set(daily_social["Year"].unique()))
-        .union(set(daily_wp_sales["Year"].unique()))
-        .union(set(daily_email["Year"].unique()))
+# Nothing is loaded until the user has logged in
+if not check_password():
+    st.session_state["login_paint_ms"] = (time.perf_counter() - SCRIPT_STARTED) * 1000
+    st.stop()
+
+refresher = get_refresher()
+
+with st.sidebar:
+    if st.button("🔄 Refresh data now"):
+        invalidate_sources()
+        with st.spinner("Refreshing data..."):
+            refresh_snapshot(refresher)
+
+if get_snapshot_store()["current"] is None:
+    # Cold start: there is nothing to serve yet, so load once on the request path
+    with st.spinner("Loading data..."):
+        refresh_snapshot(refresher)
+
+source_errors = refresher["errors"]
+snapshot = get_snapshot_store()["current"]
+if snapshot is None:
+    st.error(f"Error processing data: {refresher['last_error']}")
+    empty = pd.DataFrame()
+    snapshot = {
+        "version": 0, "built_at": time.time(), "frames": {name: empty for name in DATA_SOURCES},
+        "events": empty, "year_partitions": {}, "empty_year": {}, "all_years": {}, "chart_series": {},
+        "customers": customer_index(pd.DataFrame(columns=["email", "source", "orders", "amount"])),
+        "metrics": {},
+    }
+
+data_as_of = datetime.fromtimestamp(refresher["as_of"] or snapshot["built_at"])
+st.caption(f"Data as of {data_as_of:%d %b %Y %H:%M:%S}")
+if snapshot.get("today", reference_date()) != reference_date():
+    # The day has changed since this snapshot was built; rebuild it now rather than at the next interval
+    refresher["wake"].set()
+if refresher["last_error"] is not None:
+    st.warning(f"Showing the last loaded data, the latest refresh failed: {refresher['last_error']}")
+
+social_df = snapshot["frames"]["social"]
+sales_df = snapshot["frames"]["sales"]
+wp_sales_df = snapshot["frames"]["wp_sales"]
+email_df = snapshot["frames"]["email"]
+
+with st.sidebar:
+    source_cache = get_source_cache()
+    for name in DATA_SOURCES:
+        if name in source_errors:
+            st.warning(f"{name}: could not load ({source_errors[name]})")
+        if name in source_cache:
+            fetched = datetime.fromtimestamp(source_cache[name]["fetched_at"])
+            st.caption(f"{name}: fetched {fetched:%H:%M:%S} (TTL {source_ttl(name)}s)")
+    download_stats = get_download_stats()
+    st.caption(
+        f"Sheet downloads: {download_stats['downloaded']} performed, "
+        f"{download_stats['skipped']} skipped (unchanged)"
+    )
+    parse_cache = get_parse_cache()
+    parse_lookups = parse_cache["hits"] + parse_cache["misses"]
+    if parse_lookups:
+        st.caption(
+            f"Date parse cache: {parse_cache['hits'] / parse_lookups:.0%} hit ratio "
+            f"({len(parse_cache['entries'])} values cached)"
+        )
+    coerced_cells = {name: n for name, n in snapshot.get("coerced_cells", {}).items() if n}
+    if coerced_cells:
+        st.caption(
+            "Non-numeric cells counted as 0: "
+            + ", ".join(f"{name} {n}" for name, n in coerced_cells.items())
+        )
+    footprint = snapshot.get("footprint", {})
+    if footprint:
+        st.caption("Memory (as loaded → typed): " + ", ".join(
+            f"{name} {format_bytes(before)} → {format_bytes(after)}"
+            for name, (before, after) in footprint.items()
+        ))
+    memo_stats = get_memo_stats()
+    memo_sizes = [size for _, size, _ in memo_files()]
+    st.caption(
+        f"Disk memo: {memo_stats['hits']} hits, {memo_stats['misses']} misses, "
+        f"{memo_stats['evictions']} evicted; {len(memo_sizes)} files, "
+        f"{sum(memo_sizes) / 1024 / 1024:.1f} of {MEMO_MAX_BYTES / 1024 / 1024:.0f} MB"
+    )
+    st.caption(
+        f"Data snapshot v{snapshot['version']}, built "
+        f"{datetime.fromtimestamp(snapshot['built_at']):%H:%M:%S} (shared by all sessions)"
     )
+    # Filled in once the page has rendered
+    paint_timing = st.empty()
+
+# ====================== Daily Graph Setup =====================
+@st.fragment
+def daily_performance(snapshot):
+    """
+    Year selector, daily chart and yearly metrics.
+    Runs as a fragment, so changing the year only reruns this part of the page.
+    """
+    import altair as alt
+
+    year_partitions = snapshot["year_partitions"]
+    available_years = sorted(year_partitions)
 
     selected_year = st.selectbox(
         "Select Year",
-        available_years,
+        [*available_years, ALL_YEARS] if available_years else [],
         index=len(available_years) - 1 if available_years else 0
     )
 
-    daily_sales_filtered = daily_sales[daily_sales["Year"] == selected_year]
-    daily_wp_sales_filtered = daily_wp_sales[daily_wp_sales["Year"] == selected_year]
-    daily_social_filtered = daily_social[daily_social["Year"] == selected_year]
-    daily_email_filtered = daily_email[daily_email["Year"] == selected_year]
-
-    sales_filtered = monthly_sales[monthly_sales["Year"] == selected_year]
-    wp_sales_filtered = monthly_wp_sales[monthly_wp_sales["Year"] == selected_year]
-    social_filtered = monthly_social[monthly_social["Year"] == selected_year]
-    email_filtered = monthly_email[monthly_email["Year"] == selected_year]
-
-    # Build combined dataframe with a unified "Value" column and Type label
-    # Sales and WP sales share the left Y axis (£ amounts)
-    # Social post count and email count share the right Y axis (counts)
-    sales_plot = daily_sales_filtered[["Date", "Amount"]].rename(columns={"Amount": "Value"}).assign(Type="Thinkific Sales", Axis="£ Revenue")
-    wp_plot = daily_wp_sales_filtered[["Date", "Total Amount"]].rename(columns={"Total Amount": "Value"}).assign(Type="Webinar Sales", Axis="£ Revenue")
-    social_plot = daily_social_filtered[["Date", "Total_Score"]].rename(columns={"Total_Score": "Value"}).assign(Type="Social Posts", Axis="Count")
-    email_plot = daily_email_filtered[["Date", "Email_Count"]].rename(columns={"Email_Count": "Value"}).assign(Type="Emails Sent", Axis="Count")
-
-    combined_daily_data = pd.concat([sales_plot, wp_plot, social_plot, email_plot], ignore_index=True)
-    combined_daily_data["Date"] = pd.to_datetime(combined_daily_data["Date"])
-
-except Exception as e:
-    st.error(f"Error processing data: {e}")
-    available_years = [datetime.now().year]
-    selected_year = available_years[0]
-    combined_daily_data = pd.DataFrame()
-    sales_filtered = pd.DataFrame()
-    wp_sales_filtered = pd.DataFrame()
-    social_filtered = pd.DataFrame()
-    email_filtered = pd.DataFrame()
-
-# ====================== Tabs ======================
-tab_main, tab_sales, tab_social, tab_email, tab_payment_count = st.tabs([
-    "📈 Analytics", "Sales Data", "Social Data", "Email Marketing", "Sales by User"
-])
+    try:
+        if selected_year == ALL_YEARS:
+            year_views = snapshot["all_years"]
+        else:
+            year_views = year_partitions.get(selected_year, snapshot["empty_year"])
+        series = snapshot["chart_series"].get(selected_year) or chart_series(year_views)
+        yearly_sales_filtered = year_views["yearly_sales"]
+        yearly_wp_sales_filtered = year_views["yearly_wp_sales"]
+    except Exception as e:
+        st.error(f"Error processing data: {e}")
+        series = {}
 
-# ====================== Analytics Tab ======================
-with tab_main:
     st.header(f"Daily Performance ({selected_year})")
 
-    if not combined_daily_data.empty:
-
-        # --- Revenue lines (left Y axis) ---
-        revenue_data = combined_daily_data[combined_daily_data["Axis"] == "£ Revenue"]
-        count_data = combined_daily_data[combined_daily_data["Axis"] == "Count"]
-
-        base_revenue = alt.Chart(revenue_data).encode(
-            x=alt.X("Date:T", title="Date", axis=alt.Axis(format="%b %d", labelAngle=-45))
-        )
-
-        thinkific_line = base_revenue.transform_filter(
-            alt.datum.Type == "Thinkific Sales"
-        ).mark_line(strokeWidth=2).encode(
-            y=alt.Y("Value:Q", title="£ Revenue", scale=alt.Scale(zero=False)),
-            color=alt.value("#4C8BF5"),
-            tooltip=[
-                alt.Tooltip("Date:T", format="%d %b %Y"),
-                alt.Tooltip("Value:Q", title="Thinkific £", format=",.2f")
-            ]
-        )
-
-        wp_line = base_revenue.transform_filter(
-            alt.datum.Type == "Webinar Sales"
-        ).mark_line(strokeWidth=2).encode(
-            y=alt.Y("Value:Q", scale=alt.Scale(zero=False)),
-            color=alt.value("#2ECC71"),
-            tooltip=[
-                alt.Tooltip("Date:T", format="%d %b %Y"),
-                alt.Tooltip("Value:Q", title="Webinar £", format=",.2f")
-            ]
-        )
+    if not any(len(points) for points in series.values()):
+        st.warning("No data available to display. Check your sheet connections.")
+        return
+
+    # Each layer gets its own pre-split series, so nothing is filtered client-side
+    date_format = "%b %Y" if selected_year == ALL_YEARS else "%b %d"
+    x_axis = alt.X("Date:T", title="Date", axis=alt.Axis(format=date_format, labelAngle=-45))
+
+    # --- Revenue lines (left Y axis) ---
+    thinkific_line = alt.Chart(series["Thinkific Sales"]).mark_line(strokeWidth=2).encode(
+        x=x_axis,
+        y=alt.Y("Value:Q", title="£ Revenue", scale=alt.Scale(zero=False)),
+        color=alt.value("#4C8BF5"),
+        tooltip=[
+            alt.Tooltip("Date:T", format="%d %b %Y"),
+            alt.Tooltip("Value:Q", title="Thinkific £", format=",.2f")
+        ]
+    )
 
-        revenue_chart = alt.layer(thinkific_line, wp_line)
+    wp_line = alt.Chart(series["Webinar Sales"]).mark_line(strokeWidth=2).encode(
+        x=x_axis,
+        y=alt.Y("Value:Q", scale=alt.Scale(zero=False)),
+        color=alt.value("#2ECC71"),
+        tooltip=[
+            alt.Tooltip("Date:T", format="%d %b %Y"),
+            alt.Tooltip("Value:Q", title="Webinar £", format=",.2f")
+        ]
+    )
 
-        # --- Count dots (right Y axis) ---
-        base_count = alt.Chart(count_data).encode(
-            x=alt.X("Date:T", axis=alt.Axis(format="%b %d", labelAngle=-45))
-        )
+    revenue_chart = alt.layer(thinkific_line, wp_line)
+
+    # --- Count dots (right Y axis) ---
+    social_dots = alt.Chart(series["Social Posts"]).mark_circle(size=50).encode(
+        x=x_axis,
+        y=alt.Y("Value:Q", title="Count", scale=alt.Scale(zero=False)),
+        color=alt.value("#E74C3C"),
+        tooltip=[
+            alt.Tooltip("Date:T", format="%d %b %Y"),
+            alt.Tooltip("Value:Q", title="Posts")
+        ]
+    )
 
-        social_dots = base_count.transform_filter(
-            alt.datum.Type == "Social Posts"
-        ).mark_circle(size=50).encode(
-            y=alt.Y("Value:Q", title="Count", scale=alt.Scale(zero=False)),
-            color=alt.value("#E74C3C"),
-            tooltip=[
-                alt.Tooltip("Date:T", format="%d %b %Y"),
-                alt.Tooltip("Value:Q", title="Posts")
-            ]
-        )
+    email_dots = alt.Chart(series["Emails Sent"]).mark_circle(size=50).encode(
+        x=x_axis,
+        y=alt.Y("Value:Q", scale=alt.Scale(zero=False)),
+        color=alt.value("#F39C12"),
+        tooltip=[
+            alt.Tooltip("Date:T", format="%d %b %Y"),
+            alt.Tooltip("Value:Q", title="Emails")
+        ]
+    )
 
-        email_dots = base_count.transform_filter(
-            alt.datum.Type == "Emails Sent"
-        ).mark_circle(size=50).encode(
-            y=alt.Y("Value:Q", scale=alt.Scale(zero=False)),
-            color=alt.value("#F39C12"),
-            tooltip=[
-                alt.Tooltip("Date:T", format="%d %b %Y"),
-                alt.Tooltip("Value:Q", title="Emails")
-            ]
-        )
+    count_chart = alt.layer(social_dots, email_dots)
 
-        count_chart = alt.layer(social_dots, email_dots)
+    # --- Combine with independent Y axes ---
+    combined_chart = alt.layer(revenue_chart, count_chart).resolve_scale(
+        y="independent"
+    ).properties(
+        width=800,
+        height=420,
+        title=f"Sales, Social Posts & Emails — {selected_year}"
+    )
 
-        # --- Combine with independent Y axes ---
-        combined_chart = alt.layer(revenue_chart, count_chart).resolve_scale(
-            y="independent"
-        ).properties(
-            width=800,
-            height=420,
-            title=f"Sales, Social Posts & Emails — {selected_year}"
-        )
+    st.altair_chart(combined_chart, use_container_width=True)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.markdown("🔵 **Blue line**: Thinkific Sales (£)")
+    with col2:
+        st.markdown("🟢 **Green line**: Webinar Sales (£)")
+    with col3:
+        st.markdown("🔴 **Red dots**: Social Posts (count)")
+    with col4:
+        st.markdown("🟠 **Orange dots**: Emails Sent (count)")
+
+    st.divider()
+
+    # Yearly Metrics
+    st.subheader(f"Yearly Metrics ({selected_year})")
+    col1, col2, col3 = st.columns(3)
+    yearly_thinkific_sales = yearly_sales_filtered["Amount"].sum() if not yearly_sales_filtered.empty else 0
+    yearly_webinar_sales = yearly_wp_sales_filtered["Total Amount"].sum() if not yearly_wp_sales_filtered.empty else 0
+    yearly_total_revenue = yearly_thinkific_sales + yearly_webinar_sales
+    with col1:
+        st.metric("Total Revenue", f"£{yearly_total_revenue:,.2f}")
+    with col2:
+        st.metric("Thinkific Revenue", f"£{yearly_thinkific_sales:,.2f}")
+    with col3:
+        st.metric("Webinar Revenue", f"£{yearly_webinar_sales:,.2f}")
+
+
+# ====================== Data Table Setup =====================
+@st.fragment
+def data_table(name, snapshot):
+    """
+    Filters, sort and pager for one raw sheet; only the current page is rendered.
+    Runs as a fragment, so changing a filter or page only reruns this table.
+    """
+    df = snapshot["frames"].get(name, pd.DataFrame())
+    if df.empty:
+        st.info("No data loaded.")
+        return
+
+    filters = TABLE_FILTERS.get(name, {})
+    filter_columns = st.columns(3)
+
+    dates = None
+    date_column = filters.get("date")
+    if date_column in df.columns and df[date_column].notna().any():
+        first, last = df[date_column].min().date(), df[date_column].max().date()
+        with filter_columns[0]:
+            selected = st.date_input(
+                "Date range", value=(first, last), min_value=first, max_value=last, key=f"{name}_dates"
+            )
+        # Undated rows stay visible until the range is actually narrowed
+        if len(selected) == 2 and tuple(selected) != (first, last):
+            dates = tuple(selected)
+
+    platforms = ()
+    if filters.get("platform") in df.columns:
+        with filter_columns[1]:
+            platforms = st.multiselect(
+                "Platform", list(df[filters["platform"]].dropna().unique()), key=f"{name}_platforms"
+            )
 
-        st.altair_chart(combined_chart, use_container_width=True)
+    sender = ""
+    if filters.get("sender") in df.columns:
+        with filter_columns[1]:
+            sender = st.text_input("Sender contains", key=f"{name}_sender").strip()
+
+    with filter_columns[2]:
+        sort_column = st.selectbox("Sort by", [None, *df.columns], format_func=lambda c: c or "Sheet order",
+                                   key=f"{name}_sort")
+        ascending = not st.toggle("Descending", key=f"{name}_descending")
+
+    rows = table_rows(snapshot["version"], name, df, dates, platforms, sender, sort_column, ascending)
+
+    page_columns = st.columns([1, 1, 2])
+    with page_columns[0]:
+        page_size = st.selectbox("Rows per page", TABLE_PAGE_SIZES, key=f"{name}_page_size")
+    pages = max(1, -(-len(rows) // page_size))
+    # A narrower filter can leave the remembered page past the end
+    if st.session_state.get(f"{name}_page", 1) > pages:
+        st.session_state[f"{name}_page"] = pages
+    with page_columns[1]:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{name}_page")
+
+    start = (page - 1) * page_size
+    page_rows = rows[start:start + page_size]
+    with page_columns[2]:
+        if len(rows):
+            st.caption(f"Rows {start + 1:,}–{start + len(page_rows):,} of {len(rows):,} ({len(df):,} in sheet)")
+        else:
+            st.caption(f"No rows match ({len(df):,} in sheet)")
+    st.dataframe(df.iloc[page_rows], use_container_width=True)
 
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.markdown("🔵 **Blue line**: Thinkific Sales (£)")
-        with col2:
-            st.markdown("🟢 **Green line**: Webinar Sales (£)")
-        with col3:
-            st.markdown("🔴 **Red dots**: Social Posts (count)")
-        with col4:
-            st.markdown("🟠 **Orange dots**: Emails Sent (count)")
 
-        st.divider()
+# ====================== Tabs ======================
+tab_main, tab_sales, tab_social, tab_email, tab_payment_count = st.tabs([
+    "📈 Analytics", "Sales Data", "Social Data", "Email Marketing", "Sales by User"
+])
 
-        # Yearly Metrics
-        st.subheader(f"Yearly Metrics ({selected_year})")
-        col1, col2, col3 = st.columns(3)
-        yearly_thinkific_sales = sales_filtered["Amount"].sum() if not sales_filtered.empty and "Amount" in sales_filtered.columns else 0
-        yearly_wp_sales = wp_sales_filtered["Total Amount"].sum() if not wp_sales_filtered.empty and "Total Amount" in wp_sales_filtered.columns else 0
-        yearly_total_revenue = yearly_thinkific_sales + yearly_wp_sales
-        with col1:
-            st.metric("Total Revenue", f"£{yearly_total_revenue:,.2f}")
-        with col2:
-            st.metric("Thinkific Revenue", f"£{yearly_thinkific_sales:,.2f}")
-        with col3:
-            st.metric("Webinar Revenue", f"£{yearly_wp_sales:,.2f}")
+# ====================== Analytics Tab ======================
+with tab_main:
+    daily_performance(snapshot)
 
+    if snapshot["year_partitions"]:
         st.divider()
 
-        metrics = create_performance_metrics(sales_df, wp_sales_df, social_df, email_df)
+        metrics = snapshot["metrics"]
 
         st.header("Analytics (all data)")
         st.subheader("Total Metrics")
@@ -686,32 +2072,50 @@ with tab_main:
         with col4:
             st.metric("Emails", len(email_df))
 
-    else:
-        st.warning("No data available to display. Check your sheet connections.")
-
 # ====================== Other Tabs ======================
 with tab_sales:
     st.header("Sales Data")
-    st.dataframe(sales_df)
+    data_table("sales", snapshot)
     st.header("WP Sales Data")
-    st.dataframe(wp_sales_df)
+    data_table("wp_sales", snapshot)
 
 with tab_social:
     st.header("Social Media Data")
-    st.dataframe(social_df)
+    data_table("social", snapshot)
 
 with tab_email:
     st.header("Email Marketing Data")
-    st.dataframe(email_df)
+    data_table("email", snapshot)
 
 with tab_payment_count:
     st.header("Sales by User")
+    customers = snapshot["customers"]
+
+    lookup = st.text_input("Find customer by email", key="customer_lookup").strip()
+    if lookup:
+        customer = find_customer(customers, lookup)
+        if customer is None:
+            st.info(f"No orders found for {lookup}")
+        else:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Lifetime Value", f"£{customer['spent']:,.2f}")
+            with col2:
+                st.metric("Thinkific Purchases", f"{int(customer['thinkific_orders'])}")
+            with col3:
+                st.metric("Webinar Purchases", f"{int(customer['webinar_orders'])}")
+
+    def customer_summary(prefix):
+        summary = customers[customers[f"{prefix}_orders"] > 0]
+        summary = summary.sort_values(f"{prefix}_spent", ascending=False, kind="stable")
+        return pd.DataFrame({
+            "Email": summary.index,
+            "Purchase Count": summary[f"{prefix}_orders"].to_numpy(),
+            "Amount Spent": summary[f"{prefix}_spent"].to_numpy(),
+        })
 
     if "Email address" in sales_df.columns:
-        sales_df["Amount"] = pd.to_numeric(sales_df["Amount"], errors='coerce').fillna(0)
-        thinkific_summary = sales_df.groupby("Email address").agg({"Amount": ["sum", "count"]}).reset_index()
-        thinkific_summary.columns = ["Email address", "Amount Spent", "Purchase Count"]
-        thinkific_summary = thinkific_summary[["Email address", "Purchase Count", "Amount Spent"]]
+        thinkific_summary = customer_summary("thinkific")
         st.subheader("Thinkific Sales")
         st.write(thinkific_summary)
     else:
@@ -719,10 +2123,7 @@ with tab_payment_count:
         thinkific_summary = pd.DataFrame()
 
     if "Email" in wp_sales_df.columns:
-        wp_sales_df["Total Amount"] = pd.to_numeric(wp_sales_df["Total Amount"], errors='coerce').fillna(0)
-        wp_summary = wp_sales_df.groupby("Email").agg({"Total Amount": ["sum", "count"]}).reset_index()
-        wp_summary.columns = ["Email", "Amount Spent", "Purchase Count"]
-        wp_summary = wp_summary[["Email", "Purchase Count", "Amount Spent"]]
+        wp_summary = customer_summary("webinar")
         st.subheader("Live Webinar Sales")
         st.write(wp_summary)
     else:
@@ -731,16 +2132,25 @@ with tab_payment_count:
 
     if not thinkific_summary.empty and not wp_summary.empty:
         st.subheader("Combined Data")
-        combined_df = pd.concat([
-            thinkific_summary.rename(columns={"Email address": "Email"}),
-            wp_summary
-        ], ignore_index=True)
-        final_combined = combined_df.groupby("Email").agg({
-            "Purchase Count": "sum",
-            "Amount Spent": "sum"
-        }).reset_index().sort_values("Amount Spent", ascending=False).reset_index(drop=True)
+        final_combined = pd.DataFrame({
+            "Email": customers.index,
+            "Purchase Count": customers["orders"].to_numpy(),
+            "Amount Spent": customers["spent"].to_numpy(),
+        })
         st.write(final_combined)
     elif not thinkific_summary.empty or not wp_summary.empty:
         st.info("Only one dataset available for combination")
     else:
-        st.warning("No sales data available for analysis")
\ No newline at end of file
+        st.warning("No sales data available for analysis")
+
+# ====================== Render Timing ======================
+# Time to first paint: the login form, and the first full dashboard render of
+# this session (which includes the cold-start load if there was one).
+if "dashboard_paint_ms" not in st.session_state:
+    st.session_state["dashboard_paint_ms"] = (time.perf_counter() - SCRIPT_STARTED) * 1000
+login_paint = st.session_state.get("login_paint_ms")
+paint_timing.caption(
+    "Time to first paint: "
+    + (f"login form {login_paint:.0f} ms, " if login_paint is not None else "")
+    + f"dashboard {st.session_state['dashboard_paint_ms']:.0f} ms"
+)
@@ -1,7 +1,8 @@
+import json
+import os
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
@@ -29,7 +30,13 @@ def parse_date(date_str):
     Convert dates like "Friday, 18 July" or "Monday, 30 December 2024" to dd/mm/yyyy
     Assumes current year if year not specified
     """
-    
+    # Relative headers for the last two days: "Today" / "Yesterday, 5 March"
+    lower = date_str.strip().lower()
+    if lower.startswith("today"):
+        return datetime.now().strftime("%d/%m/%Y")
+    if lower.startswith("yesterday"):
+        return (datetime.now() - timedelta(days=1)).strftime("%d/%m/%Y")
+
     try:
         date_part = date_str.split(', ', 1)[1]
         dt = datetime.strptime(date_part, "%d %B")
@@ -43,125 +50,194 @@ def parse_date(date_str):
     return dt.strftime("%d/%m/%Y")
 
 
-# --- Auto scroll ---
-last_height = driver.execute_script("return document.body.scrollHeight")
-while True:
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(2)
-    new_height = driver.execute_script("return document.body.scrollHeight")
-    if new_height == last_height:
-        break
-    last_height = new_height
+# The full history is scraped in windows: each pass serializes the posts
+# rendered since the last pass in one execute_script call, empties the nodes it
+# read, and scrolls for more. A read node keeps only its marked, hidden shell:
+# Buffer's timeline still owns it and inserts new posts relative to it, and the
+# shells keep the child count that scrolling waits on, while the post subtrees
+# are dropped so page memory stays flat however long the history is. The last
+# node read is kept as a cursor on the page, so each pass starts after it
+# instead of walking every shell again. Rows are streamed to STAGING_FILE as
+# they are collected, and the sheet is only replaced once the whole history has
+# been read, so a failed run leaves it untouched.
+SCROLL_POLL_INTERVAL = 0.25
+SCROLL_MAX_INTERVAL = 2
+SCROLL_QUIET_PERIOD = 10
+STAGING_FILE = "buffer_all_data.staging.jsonl"
+
+HEADER = ["Date", "Time", "Platform", "Post", "Likes/Reactions", "Comments", "Impressions", "Shares", "Clicks/Eng. Rate", "Total Social Score"]
+
+# Serializes the date headers and posts (with their label/metric pairs) after
+# the cursor, then marks them read, empties and hides them. Anything else, like
+# the loading indicator, is left alone. If the timeline has dropped the cursor
+# node, the pass starts from the top and skips the marked shells.
+WINDOW_SCRIPT = """
+const wrapper = document.querySelector(".publish_timeline_qL9zu");
+if (!wrapper) return JSON.stringify({entries: [], children: 0});
+const text = (root, selector) => {
+    const el = root.querySelector(selector);
+    return el ? el.innerText.trim() : "";
+};
+const entries = [];
+let cursor = window.__bufferScrapeCursor;
+let block = cursor && cursor.parentNode === wrapper ? cursor.nextElementSibling : wrapper.firstElementChild;
+for (; block; block = block.nextElementSibling) {
+    if (block.hasAttribute("data-scraped")) continue;
+    const className = block.getAttribute("class") || "";
+    if (className.includes("publish_base_Y1USt")) {
+        entries.push({type: "date", text: block.innerText.trim()});
+    } else if (className.includes("publish_postContainer") || className.includes("publish_wrapper_KDBT-")) {
+        const channel = block.querySelector("div[data-channel]");
+        const metrics = [];
+        for (const metric of block.querySelectorAll(".publish_wrapper_6Zayg")) {
+            const label = metric.querySelector(".publish_label_79dYt");
+            const value = metric.querySelector(".publish_metric_3fmE3");
+            if (label && value) metrics.push([label.innerText.trim(), value.innerText.trim()]);
+        }
+        entries.push({
+            type: "post",
+            platform: channel ? channel.getAttribute("data-channel") || "" : "",
+            time: text(block, ".publish_labelContainer_NIys3"),
+            body: text(block, ".publish_body_oZVDR"),
+            metrics: metrics,
+        });
+    } else {
+        continue;
+    }
+    block.setAttribute("data-scraped", "");
+    block.replaceChildren();
+    block.style.display = "none";
+    cursor = block;
+}
+window.__bufferScrapeCursor = cursor;
+return JSON.stringify({entries: entries, children: wrapper.children.length});
+"""
+
+# Scrolls to the bottom and reports how many children the timeline has
+SCROLL_SCRIPT = """
+window.scrollTo(0, document.body.scrollHeight);
+const wrapper = document.querySelector(".publish_timeline_qL9zu");
+return wrapper ? wrapper.children.length : 0;
+"""
+
+
+def extract_window(driver):
+    """
+    Read and empty the posts rendered since the last call, in a single round trip.
+    Returns ({"type": "date", "text"} and
+    {"type": "post", "platform", "time", "body", "metrics": [[label, value], ...]} entries
+    in page order, number of timeline children on the page).
+    """
+    window = json.loads(driver.execute_script(WINDOW_SCRIPT))
+    return window["entries"], window["children"]
 
-print("✅ Finished scrolling")
 
-# --- Scrape ---
-wrapper = driver.find_element(By.CLASS_NAME, "publish_timeline_qL9zu")
-elements = wrapper.find_elements(By.XPATH, "./*")
-
-# Header row
-data = [["Date", "Time", "Platform", "Post", "Likes/Reactions", "Comments", "Impressions", "Shares", "Clicks/Eng. Rate", "Total Social Score"]]
-current_date = None
-
-for block in elements:
-    class_name = block.get_attribute("class")
-
-    # Date header
-    if "publish_base_Y1USt" in class_name:
-        current_date = block.text.strip()
-        continue
-
-    # Post container
-    if "publish_postContainer" in class_name or "publish_wrapper_KDBT-" in class_name:
-        try:
-            platform_elem = block.find_element(By.CSS_SELECTOR, 'div[data-channel]')
-            platform_info = platform_elem.get_attribute("data-channel")
-        except:
-            platform_info = ""
-        try:
-            time_text = block.find_element(By.CLASS_NAME, "publish_labelContainer_NIys3").text.strip()
-        except:
-            time_text = ""
-        try:
-            post_text = block.find_element(By.CLASS_NAME, "publish_body_oZVDR").text.strip()
-        except:
-            post_text = ""
-        try:
-            platform = block.find_element(By.CLASS_NAME, "publish_channelName_MobA0").text.strip()
-        except:
-            platform = ""
-
-        # Metrics dictionary
-        metrics = {
-            "Likes": "",
-            "Reactions": "",
-            "Comments": "",
-            "Impressions": "",
-            "Shares": "",
-            "Clicks": "",
-            "Eng. Rate": ""
-        }
+def wait_for_timeline_growth(driver, known_children):
+    """
+    Keep scrolling to the bottom until the timeline has more than known_children
+    children, polling with exponential backoff.
+    Returns True, or False after SCROLL_QUIET_PERIOD without growth.
+    """
+    deadline = time.monotonic() + SCROLL_QUIET_PERIOD
+    interval = SCROLL_POLL_INTERVAL
+    while True:
+        if driver.execute_script(SCROLL_SCRIPT) > known_children:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+        interval = min(interval * 2, SCROLL_MAX_INTERVAL)
+
+
+def post_row(current_date, entry):
+    """Sheet row for one post under the given date header."""
+    platform_info = entry["platform"]
+    time_text = entry["time"]
+    post_text = entry["body"]
+
+    # Metrics dictionary
+    metrics = {
+        "Likes": "",
+        "Reactions": "",
+        "Comments": "",
+        "Impressions": "",
+        "Shares": "",
+        "Clicks": "",
+        "Eng. Rate": ""
+    }
+
+    for label, value in entry["metrics"]:
+        metrics[label] = value
+
+    # Merge Likes/Reactions into one column for sheet
+    try:
+        likes_reactions = int(metrics.get("Likes")) or int(metrics.get("Reactions"))
+    except:
+        likes_reactions = 0
+    try:
+        clicks_eng = int(metrics.get("Clicks")) or int(metrics.get("Eng. Rate"))
+    except:
+        clicks_eng = 0
+
+    try:
+        comment_val = int(metrics.get("Comments"))
+    except:
+        comment_val = 0
 
-        try:
-            metric_wrappers = block.find_elements(By.CLASS_NAME, "publish_wrapper_6Zayg")
-            for m in metric_wrappers:
-                try:
-                    label = m.find_element(By.CLASS_NAME, "publish_label_79dYt").text.strip()
-                    value = m.find_element(By.CLASS_NAME, "publish_metric_3fmE3").text.strip()
-
-                    
-                    metrics[label] = value
-                    
-                except:
-                    pass
-        except:
-            pass
-
-        # Merge Likes/Reactions into one column for sheet
-        try:
-            
-            likes_reactions = int(metrics.get("Likes")) or int(metrics.get("Reactions"))
-        except:
-            likes_reactions = 0
-        try:
-            clicks_eng = int(metrics.get("Clicks")) or int(metrics.get("Eng. Rate"))
-        except:
-            clicks_eng = 0
-
-        try:
-            comment_val = int(metrics.get("Comments"))
-        except:
-            comment_val = 0
-
-        try:
-            immpression_val = int(metrics.get("Impressions"))
-        except:
-            immpression_val = 0
-
-        try:
-            share_val = int(metrics.get("Shares"))
-        except:
-            share_val = 0
-       
-
-        social_score = likes_reactions + clicks_eng + comment_val + immpression_val + share_val
-     
-        data.append([
-            parse_date(current_date),
-            time_text,
-            platform_info,
-            post_text,
-            likes_reactions,
-            metrics.get("Comments"),
-            metrics.get("Impressions"),
-            metrics.get("Shares"),
-            clicks_eng,
-            social_score
-        ])
+    try:
+        immpression_val = int(metrics.get("Impressions"))
+    except:
+        immpression_val = 0
 
+    try:
+        share_val = int(metrics.get("Shares"))
+    except:
+        share_val = 0
+
+    social_score = likes_reactions + clicks_eng + comment_val + immpression_val + share_val
+
+    return [
+        parse_date(current_date),
+        time_text,
+        platform_info,
+        post_text,
+        likes_reactions,
+        metrics.get("Comments"),
+        metrics.get("Impressions"),
+        metrics.get("Shares"),
+        clicks_eng,
+        social_score
+    ]
+
+
+# --- Scrape in windows, newest first, into the staging file ---
+scraped = 0
+current_date = None  # Carries over between windows: a window can start mid-day
+
+with open(STAGING_FILE, "w", encoding="utf-8") as staging:
+    while True:
+        entries, children = extract_window(driver)
+        for entry in entries:
+            if entry["type"] == "date":
+                current_date = entry["text"]
+            else:
+                staging.write(json.dumps(post_row(current_date, entry)) + "\n")
+                scraped += 1
+        staging.flush()
+        if entries:
+            print(f"  Scraped {scraped} posts so far...")
+
+        if not wait_for_timeline_growth(driver, children):
+            break
+
+print("✅ Finished scrolling")
 driver.quit()
 
-# --- Upload to Google Sheets ---
+# --- Upload to Google Sheets, replacing the old data only now ---
+with open(STAGING_FILE, encoding="utf-8") as staging:
+    data = [HEADER] + [json.loads(line) for line in staging]
+
 sheet.clear()
 sheet.update("A1", data)
+os.remove(STAGING_FILE)
 print(f"✅ Uploaded {len(data)-1} posts to Google Sheet: {SHEET_NAME}")
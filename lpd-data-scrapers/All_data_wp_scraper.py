@@ -1,5 +1,6 @@
 import time
 import os
+import sys
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -36,6 +37,11 @@ actions = ActionChains(driver)
 PAGE_2_URL = "https://linguistpd.co.uk/wp-admin/edit.php?post_type=wpsc_cart_orders&mode=list&paged=2"
 PAGE_1_URL = "https://linguistpd.co.uk/wp-admin/edit.php?post_type=wpsc_cart_orders&mode=list&paged=1"
 
+# The order list and detail reads are shared with scrapers/wp-scraper.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scrapers"))
+from wp_admin_orders import read_order_list, fetch_order_details
+
+
 # ---------------- AUTOMATIC WORDPRESS LOGIN ----------------
 def login_to_wordpress():
     """Automatically log in to WordPress"""
@@ -71,72 +77,39 @@ def scrape_page_data_bottom_to_top():
     page_data = []
     
     try:
-        table = driver.find_elements(By.CLASS_NAME, "iedit")
+        table = read_order_list(driver)
         print(f"Found {len(table)} orders on this page")
-        
-        # Store main window handle
-        main_window = driver.current_window_handle
 
         # Scrape from bottom to top (reverse order)
+        rows = []
         for index in range(len(table)-1, -1, -1):
-            try:
-                # Re-find the row in case the table gets stale
-                current_table = driver.find_elements(By.CLASS_NAME, "iedit")
-                row = current_table[index]
-                
-                # Extract basic info from the main page first
-                order_id = row.find_element(By.CLASS_NAME, "title").text.strip()
-                f_name = row.find_element(By.CLASS_NAME, "wpsc_first_name").text.strip()
-                l_name = row.find_element(By.CLASS_NAME, "wpsc_last_name").text.strip()
-                email = row.find_element(By.CLASS_NAME, "wpsc_email_address").text.strip()
-                amount = row.find_element(By.CLASS_NAME, "wpsc_total_amount").text.strip()
-                payment_status = row.find_element(By.CLASS_NAME, "wpsc_order_status").text.strip()
-                date = row.find_element(By.CLASS_NAME, "date").text.strip()
-                
-                print(f"Processing order {len(table)-index} of {len(table)}: {order_id}")
-                
-                # Open order details in new tab
-                order_detail_url = f"https://linguistpd.co.uk/wp-admin/post.php?post={order_id}&action=edit"
-                
-                # Open new tab
-                driver.execute_script("window.open('');")
-                driver.switch_to.window(driver.window_handles[1])
-                driver.get(order_detail_url)
-                
-                # Get order details quickly
-                try:
-                    order_element = wait.until(
-                        EC.presence_of_element_located((By.NAME, "wpsc_items_ordered"))
-                    )
-                    total_element = wait.until(
-                        EC.presence_of_element_located((By.NAME, "wpsc_total_amount"))
-                    )
-                    print(total_element)
-                    order = order_element.text.strip()
-                    amount = total_element.get_attribute("value")
-                    print(f"  Order details found: {len(order)} characters \n\n amount: {amount}")
-                except Exception as detail_error:
-                    print(f"  Could not find order details: {detail_error}")
-                    order = "N/A"
-                
-                # Close the tab and switch back to main window
-                driver.close()
-                driver.switch_to.window(main_window)
-                
-                # Add data to our list
-                page_data.append([order_id, f_name, l_name, email, amount, payment_status, date, order])
-                
-                print(f"Completed order {len(table)-index} of {len(table)}")
-                
-            except Exception as e:
-                print(f"Error processing row {index}: {e}")
-                # Ensure we're back on main window if something goes wrong
-                if len(driver.window_handles) > 1:
-                    driver.switch_to.window(driver.window_handles[-1])
-                    driver.close()
-                driver.switch_to.window(main_window)
+            row = table[index]
+            if None in row.values():
+                print(f"Error processing row {index}: missing column")
                 continue
-                
+            rows.append(row)
+
+        details = fetch_order_details(driver, [row["order_id"] for row in rows])
+
+        for position, row in enumerate(rows, start=1):
+            order_id = row["order_id"]
+            print(f"Processing order {position} of {len(rows)}: {order_id}")
+
+            # Fall back to the list's amount if the order page couldn't be read
+            amount = row["amount"]
+            detail = details.get(order_id, {"error": "not fetched"})
+            if "error" in detail:
+                print(f"  Could not find order details: {detail['error']}")
+                order = "N/A"
+            else:
+                order = detail["order"]
+                amount = detail["amount"]
+                print(f"  Order details found: {len(order)} characters \n\n amount: {amount}")
+
+            # Add data to our list
+            page_data.append([order_id, row["f_name"], row["l_name"], row["email"], amount,
+                              row["payment_status"], row["date"], order])
+
     except Exception as e:
         print(f"Error finding orders table: {e}")
         print("Please check if you're logged in and on the correct page.")
@@ -1,4 +1,5 @@
 import os
+import json
 import time
 from datetime import datetime, timedelta
 from selenium import webdriver
@@ -25,6 +26,15 @@ creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", SCO
 client = gspread.authorize(creds)
 sheet = client.open(SHEET_NAME).sheet1
 
+# ---------------- SCROLL SETTINGS ----------------
+# After each scroll the timeline is polled for new children, starting every
+# SCROLL_POLL_INTERVAL seconds and backing off to SCROLL_MAX_INTERVAL.
+# Scrolling stops once the cutoff date is rendered, or when nothing new has
+# appeared for SCROLL_QUIET_PERIOD seconds.
+SCROLL_POLL_INTERVAL = float(os.getenv("SCROLL_POLL_INTERVAL", 0.25))
+SCROLL_MAX_INTERVAL = float(os.getenv("SCROLL_MAX_INTERVAL", 2))
+SCROLL_QUIET_PERIOD = float(os.getenv("SCROLL_QUIET_PERIOD", 8))
+
 
 def parse_sheet_date(date_str):
     """Parse sheet date format: '24/04/2023' -> datetime"""
@@ -113,68 +123,117 @@ def login_to_buffer(driver, wait):
     print("Logged in successfully.")
 
 
+# Scrolls to the bottom and reports the timeline's child count and the text of
+# its last (oldest) date header, in one round trip.
+SCROLL_SCRIPT = """
+window.scrollTo(0, document.body.scrollHeight);
+const wrapper = document.querySelector(".publish_timeline_qL9zu");
+const headers = wrapper ? wrapper.querySelectorAll(".publish_base_Y1USt") : [];
+return {
+    children: wrapper ? wrapper.children.length : 0,
+    oldest: headers.length ? headers[headers.length - 1].innerText.trim() : "",
+};
+"""
+
+
+def wait_for_timeline_growth(driver, known_children):
+    """
+    Keep scrolling to the bottom until the timeline has more than known_children
+    children, polling with exponential backoff.
+    Returns the new timeline state, or None after SCROLL_QUIET_PERIOD without growth.
+    """
+    deadline = time.monotonic() + SCROLL_QUIET_PERIOD
+    interval = SCROLL_POLL_INTERVAL
+    while True:
+        state = driver.execute_script(SCROLL_SCRIPT)
+        if state["children"] > known_children:
+            return state
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+        interval = min(interval * 2, SCROLL_MAX_INTERVAL)
+
+
 def initial_page_load_scroll(driver):
     """
-    After the page first loads, do a deliberate scroll -> 10s wait -> scroll again
-    to ensure the initial batch of posts is fully rendered before we start scraping.
+    Wait for the first batch of posts to render before scrolling for more.
     """
-    print("Initial page load scroll...")
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    print("  Scrolled down — waiting 10s for content to load...")
-    time.sleep(10)
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    print("  Scrolled again — waiting 5s...")
-    time.sleep(5)
-    driver.execute_script("window.scrollTo(0, 0);")  # Back to top before scraping loop
-    time.sleep(2)
-    print("Initial load scroll complete.")
+    print("Waiting for the first posts to render...")
+    if wait_for_timeline_growth(driver, 0) is None:
+        print(f"  No posts rendered within {SCROLL_QUIET_PERIOD:g}s.")
+    print("Initial load complete.")
 
 
 def scroll_until_stable(driver, latest_known_date):
     """
-    Scroll to the bottom in a loop.
-    Each iteration: scroll -> wait 10s -> scroll again -> wait 3s -> check height.
-    Stops when height is stable across 2 consecutive passes, or we've passed the cutoff date.
+    Scroll to the bottom, waiting only as long as it takes new posts to appear.
+    Stops as soon as the cutoff date is rendered, or when no new posts have
+    appeared for SCROLL_QUIET_PERIOD seconds.
     """
     print("Starting scroll to load all relevant posts...")
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    passes_without_change = 0
+    state = driver.execute_script(SCROLL_SCRIPT)
 
     while True:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        print("  Scrolled — waiting 10s...")
-        time.sleep(10)
+        # Early exit once the cutoff date is on the page
+        if latest_known_date and state["oldest"]:
+            oldest_visible_date = parse_buffer_date(state["oldest"])
+            if oldest_visible_date and oldest_visible_date <= latest_known_date:
+                print(f"  Scrolled past cutoff date ({state['oldest']}). Stopping scroll.")
+                break
 
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
+        new_state = wait_for_timeline_growth(driver, state["children"])
+        if new_state is None:
+            print(f"Page fully loaded (nothing new for {SCROLL_QUIET_PERIOD:g}s).")
+            break
+        state = new_state
+        print(f"  New content loaded ({state['children']} timeline items). Continuing scroll...")
 
-        new_height = driver.execute_script("return document.body.scrollHeight")
+    print("Scroll complete.")
 
-        if new_height == last_height:
-            passes_without_change += 1
-            if passes_without_change >= 2:
-                print("Page fully loaded (height stable across 2 passes).")
-                break
-        else:
-            passes_without_change = 0
-            last_height = new_height
-            print(f"  New content loaded (height: {new_height}px). Continuing scroll...")
-
-        # Early exit if we've scrolled past the cutoff date
-        if latest_known_date:
-            try:
-                date_headers = driver.find_elements(By.XPATH,
-                    "//*[contains(@class, 'publish_base_Y1USt')]")
-                if date_headers:
-                    oldest_visible_text = date_headers[-1].text.strip()
-                    oldest_visible_date = parse_buffer_date(oldest_visible_text)
-                    if oldest_visible_date and oldest_visible_date <= latest_known_date:
-                        print(f"  Scrolled past cutoff date ({oldest_visible_text}). Stopping scroll.")
-                        break
-            except Exception:
-                pass
 
-    print("Scroll complete.")
+# One execute_script call serializes the whole timeline (date headers and
+# posts with their label/metric pairs), instead of several WebDriver round
+# trips per post.
+TIMELINE_SCRIPT = """
+const wrapper = document.querySelector(".publish_timeline_qL9zu");
+if (!wrapper) return "[]";
+const text = (root, selector) => {
+    const el = root.querySelector(selector);
+    return el ? el.innerText.trim() : "";
+};
+const entries = [];
+for (const block of wrapper.children) {
+    const className = block.getAttribute("class") || "";
+    if (className.includes("publish_base_Y1USt")) {
+        entries.push({type: "date", text: block.innerText.trim()});
+    } else if (className.includes("publish_postContainer") || className.includes("publish_wrapper_KDBT-")) {
+        const channel = block.querySelector("div[data-channel]");
+        const metrics = [];
+        for (const metric of block.querySelectorAll(".publish_wrapper_6Zayg")) {
+            const label = metric.querySelector(".publish_label_79dYt");
+            const value = metric.querySelector(".publish_metric_3fmE3");
+            if (label && value) metrics.push([label.innerText.trim(), value.innerText.trim()]);
+        }
+        entries.push({
+            type: "post",
+            platform: channel ? channel.getAttribute("data-channel") || "" : "",
+            time: text(block, ".publish_labelContainer_NIys3"),
+            body: text(block, ".publish_body_oZVDR"),
+            metrics: metrics,
+        });
+    }
+}
+return JSON.stringify(entries);
+"""
+
+
+def extract_timeline(driver):
+    """
+    Read the rendered timeline in a single round trip.
+    Returns a list of {"type": "date", "text"} and
+    {"type": "post", "platform", "time", "body", "metrics": [[label, value], ...]} entries, in page order.
+    """
+    return json.loads(driver.execute_script(TIMELINE_SCRIPT))
 
 
 # ---------------- SELENIUM SETUP ----------------
@@ -189,35 +248,31 @@ login_to_buffer(driver, wait)
 # Navigate to sent posts
 driver.get("https://publish.buffer.com/all-channels?tab=sent")
 wait.until(EC.presence_of_element_located((By.CLASS_NAME, "publish_timeline_qL9zu")))
-time.sleep(3)
 
 # Get cutoff date from sheet
 latest_known_date = get_latest_date_from_sheet()
 
-# Step 1: deliberate initial scroll to ensure first batch loads fully
+# Step 1: wait for the first batch of posts
 initial_page_load_scroll(driver)
 
 # Step 2: keep scrolling until all new posts are loaded
 scroll_until_stable(driver, latest_known_date)
 
 # ---------------- SCRAPE ----------------
-wrapper = driver.find_element(By.CLASS_NAME, "publish_timeline_qL9zu")
-elements = wrapper.find_elements(By.XPATH, "./*")
+timeline = extract_timeline(driver)
 
 new_data = []
 current_date = None
 current_date_parsed = None
 stop_scraping = False
 
-for block in elements:
+for entry in timeline:
     if stop_scraping:
         break
 
-    class_name = block.get_attribute("class")
-
     # Date header block
-    if "publish_base_Y1USt" in class_name:
-        current_date_text = block.text.strip()
+    if entry["type"] == "date":
+        current_date_text = entry["text"]
         current_date_parsed = parse_buffer_date(current_date_text)
 
         if current_date_parsed:
@@ -233,25 +288,13 @@ for block in elements:
         continue
 
     # Post container
-    if "publish_postContainer" in class_name or "publish_wrapper_KDBT-" in class_name:
+    if entry["type"] == "post":
         if stop_scraping:
             break
 
-        try:
-            platform_elem = block.find_element(By.CSS_SELECTOR, 'div[data-channel]')
-            platform_info = platform_elem.get_attribute("data-channel")
-        except Exception:
-            platform_info = ""
-
-        try:
-            time_text = block.find_element(By.CLASS_NAME, "publish_labelContainer_NIys3").text.strip()
-        except Exception:
-            time_text = ""
-
-        try:
-            post_text = block.find_element(By.CLASS_NAME, "publish_body_oZVDR").text.strip()
-        except Exception:
-            post_text = ""
+        platform_info = entry["platform"]
+        time_text = entry["time"]
+        post_text = entry["body"]
 
         metrics = {
             "Likes": "",
@@ -263,17 +306,8 @@ for block in elements:
             "Eng. Rate": ""
         }
 
-        try:
-            metric_wrappers = block.find_elements(By.CLASS_NAME, "publish_wrapper_6Zayg")
-            for m in metric_wrappers:
-                try:
-                    label = m.find_element(By.CLASS_NAME, "publish_label_79dYt").text.strip()
-                    value = m.find_element(By.CLASS_NAME, "publish_metric_3fmE3").text.strip()
-                    metrics[label] = value
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        for label, value in entry["metrics"]:
+            metrics[label] = value
 
         try:
             likes_reactions = int(metrics.get("Likes") or metrics.get("Reactions") or 0)
@@ -56,6 +56,10 @@ def parse_wp_date(date_str):
         return None
 
 
+# The order list and detail reads are shared with lpd-data-scrapers/All_data_wp_scraper.py
+from wp_admin_orders import read_order_list, fetch_order_details
+
+
 # ---------------- AUTOMATIC WORDPRESS LOGIN ----------------
 def login_to_wordpress():
     """Automatically log in to WordPress"""
@@ -120,81 +124,55 @@ def scrape_new_orders_from_page(last_known_order_id, last_known_date):
     new_orders_data = []
 
     try:
-        table = driver.find_elements(By.CLASS_NAME, "iedit")
+        table = read_order_list(driver)
         print(f"Found {len(table)} orders on page 1")
 
-        main_window = driver.window_handles[0]
-
-        for index in range(len(table)):
-            try:
-                # Re-find rows to avoid stale element references
-                current_table = driver.find_elements(By.CLASS_NAME, "iedit")
-                row = current_table[index]
-
-                # Order ID — always treat as string
-                order_id = str(row.find_element(By.CLASS_NAME, "title").text.strip())
-
-                # Date
-                date_raw = row.find_element(By.CLASS_NAME, "date").text.strip()
-                order_date = parse_wp_date(date_raw)
-
-                # Stop condition 1: ID match
-                if last_known_order_id and order_id == last_known_order_id:
-                    print(f"Reached last known order ID {order_id}. Stopping.")
-                    break
-
-                # Stop condition 2: Date is at or before the last known date
-                if last_known_date and order_date and order_date <= last_known_date:
-                    print(f"Order {order_id} date ({date_raw}) is not newer than last known. Stopping.")
-                    break
-
-                f_name = row.find_element(By.CLASS_NAME, "wpsc_first_name").text.strip()
-                l_name = row.find_element(By.CLASS_NAME, "wpsc_last_name").text.strip()
-                email = row.find_element(By.CLASS_NAME, "wpsc_email_address").text.strip()
-                payment_status = row.find_element(By.CLASS_NAME, "wpsc_order_status").text.strip()
-
-                print(f"Processing new order {index + 1}: ID={order_id}  Date={date_raw}")
-
-                # Open order detail in a new tab
-                order_detail_url = (
-                    f"https://linguistpd.co.uk/wp-admin/post.php?post={order_id}&action=edit"
-                )
-                driver.execute_script("window.open('');")
-                driver.switch_to.window(driver.window_handles[1])
-                driver.get(order_detail_url)
-
-                order = "N/A"
-                amount = "N/A"
-                try:
-                    order_element = wait.until(
-                        EC.presence_of_element_located((By.NAME, "wpsc_items_ordered"))
-                    )
-                    total_element = wait.until(
-                        EC.presence_of_element_located((By.NAME, "wpsc_total_amount"))
-                    )
-                    order = order_element.text.strip()
-                    amount = total_element.get_attribute("value").strip()
-                    print(f"  Items: {len(order)} chars  |  Total: {amount}")
-                except Exception as detail_error:
-                    print(f"  Could not get order details: {detail_error}")
-
-                # Close tab and return to list
-                driver.close()
-                driver.switch_to.window(main_window)
-
-                new_orders_data.append(
-                    [order_id, f_name, l_name, email, amount, payment_status, date_raw, order]
-                )
-                print(f"  Collected order {index + 1}")
-
-            except Exception as e:
-                print(f"Error processing row {index}: {e}")
-                if len(driver.window_handles) > 1:
-                    driver.switch_to.window(driver.window_handles[-1])
-                    driver.close()
-                driver.switch_to.window(main_window)
+        new_rows = []
+        for index, row in enumerate(table):
+            # Order ID — always treat as string
+            order_id = row["order_id"]
+
+            # Date
+            date_raw = row["date"]
+            order_date = parse_wp_date(date_raw)
+
+            # Stop condition 1: ID match
+            if last_known_order_id and order_id == last_known_order_id:
+                print(f"Reached last known order ID {order_id}. Stopping.")
+                break
+
+            # Stop condition 2: Date is at or before the last known date
+            if last_known_date and order_date and order_date <= last_known_date:
+                print(f"Order {order_id} date ({date_raw}) is not newer than last known. Stopping.")
+                break
+
+            if None in row.values():
+                print(f"Error processing row {index}: missing column")
                 continue
 
+            print(f"Processing new order {index + 1}: ID={order_id}  Date={date_raw}")
+            new_rows.append(row)
+
+        details = fetch_order_details(driver, [row["order_id"] for row in new_rows])
+
+        for row in new_rows:
+            order_id = row["order_id"]
+            detail = details.get(order_id, {"error": "not fetched"})
+
+            order = "N/A"
+            amount = "N/A"
+            if "error" in detail:
+                print(f"  Could not get order details for {order_id}: {detail['error']}")
+            else:
+                order = detail["order"]
+                amount = detail["amount"]
+                print(f"  Order {order_id}  Items: {len(order)} chars  |  Total: {amount}")
+
+            new_orders_data.append(
+                [order_id, row["f_name"], row["l_name"], row["email"], amount,
+                 row["payment_status"], row["date"], order]
+            )
+
     except Exception as e:
         print(f"Error finding orders table: {e}")
         print(f"Current URL: {driver.current_url}")
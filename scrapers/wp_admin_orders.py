@@ -0,0 +1,80 @@
+"""
+Order list and order detail reads shared by the Selenium WordPress scrapers
+(wp-scraper.py and lpd-data-scrapers/All_data_wp_scraper.py). Both take the
+logged-in driver; import this after load_dotenv so the WP_DETAIL_* settings
+are picked up.
+"""
+import json
+import os
+
+# The order list is read in one execute_script call. Order edit pages are then
+# fetched from inside the logged-in page, DETAIL_CONCURRENCY at a time, and the
+# two order fields are parsed there; all results come back in one
+# execute_async_script round trip instead of a tab and page render per order.
+ORDER_DETAIL_URL = "https://linguistpd.co.uk/wp-admin/post.php?post={order_id}&action=edit"
+DETAIL_CONCURRENCY = int(os.getenv("WP_DETAIL_CONCURRENCY", 6))
+DETAIL_FETCH_TIMEOUT = int(os.getenv("WP_DETAIL_FETCH_TIMEOUT", 300))
+
+# List row cells by class; a missing cell comes back as null. Row actions
+# ("Edit | Trash") and screen-reader labels sit off-screen rather than hidden,
+# so innerText would include them where Selenium's .text didn't; they're
+# hidden first.
+ORDER_LIST_SCRIPT = """
+for (const el of document.querySelectorAll(".iedit .row-actions, .iedit .screen-reader-text")) {
+    el.style.display = "none";
+}
+const text = (row, className) => {
+    const el = row.querySelector("." + className);
+    return el ? el.innerText.trim() : null;
+};
+return JSON.stringify(Array.from(document.getElementsByClassName("iedit"), row => ({
+    order_id: text(row, "title"),
+    f_name: text(row, "wpsc_first_name"),
+    l_name: text(row, "wpsc_last_name"),
+    email: text(row, "wpsc_email_address"),
+    amount: text(row, "wpsc_total_amount"),
+    payment_status: text(row, "wpsc_order_status"),
+    date: text(row, "date"),
+})));
+"""
+
+ORDER_DETAILS_SCRIPT = """
+const [orders, concurrency, done] = arguments;
+const results = {};
+let next = 0;
+const worker = async () => {
+    while (next < orders.length) {
+        const [orderId, url] = orders[next++];
+        try {
+            const response = await fetch(url, {credentials: "same-origin"});
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const page = new DOMParser().parseFromString(await response.text(), "text/html");
+            const items = page.querySelector('[name="wpsc_items_ordered"]');
+            const total = page.querySelector('[name="wpsc_total_amount"]');
+            if (!items || !total) throw new Error("order fields not found");
+            results[orderId] = {order: items.value.trim(), amount: total.value.trim()};
+        } catch (error) {
+            results[orderId] = {error: String(error)};
+        }
+    }
+};
+const workers = Array.from({length: Math.min(concurrency, orders.length)}, worker);
+Promise.all(workers).then(() => done(JSON.stringify(results)));
+"""
+
+
+def read_order_list(driver):
+    """Rows of the current order list page, top to bottom, as dicts of cell text."""
+    return json.loads(driver.execute_script(ORDER_LIST_SCRIPT))
+
+
+def fetch_order_details(driver, order_ids):
+    """
+    Fetch the edit pages of these orders concurrently from inside the browser.
+    Returns {order_id: {"order", "amount"}} or {order_id: {"error"}}.
+    """
+    if not order_ids:
+        return {}
+    driver.set_script_timeout(DETAIL_FETCH_TIMEOUT)
+    orders = [[order_id, ORDER_DETAIL_URL.format(order_id=order_id)] for order_id in order_ids]
+    return json.loads(driver.execute_async_script(ORDER_DETAILS_SCRIPT, orders, DETAIL_CONCURRENCY))
@@ -0,0 +1,353 @@
+"""
+Browserless version of wp-scraper.py: logs in to WordPress with a
+requests.Session, reads the first page of the order list and fetches the new
+orders' edit pages over keep-alive connections from a small worker pool.
+Appends the same rows as the Selenium scraper.
+
+WP_BASE_URL points it at another site, e.g. a local server with saved pages.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from html.parser import HTMLParser
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
+
+# Get WordPress credentials from .env
+WP_USERNAME = os.getenv('WP_USERNAME')
+WP_PASSWORD = os.getenv('WP_PASSWORD')
+
+WP_BASE_URL = os.getenv("WP_BASE_URL", "https://linguistpd.co.uk").rstrip("/")
+LOGIN_URL = f"{WP_BASE_URL}/wp-login.php"
+PAGE_1_URL = f"{WP_BASE_URL}/wp-admin/edit.php?post_type=wpsc_cart_orders&mode=list&paged=1"
+ORDER_DETAIL_URL = f"{WP_BASE_URL}/wp-admin/post.php?post={{order_id}}&action=edit"
+
+DETAIL_CONCURRENCY = int(os.getenv("WP_DETAIL_CONCURRENCY", 6))
+REQUEST_TIMEOUT = int(os.getenv("WP_REQUEST_TIMEOUT", 30))
+
+# ---------------- GOOGLE SHEETS SETUP ----------------
+SHEET_NAME = "WordPress Sales Data"
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+
+def open_sheet():
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", SCOPE)
+    client = gspread.authorize(creds)
+    return client.open(SHEET_NAME).sheet1
+
+
+def parse_wp_date(date_str):
+
+    try:
+        # Split on newlines and take the last non-empty part
+        # This handles the case where "Published" and the date are on separate lines
+        parts = [p.strip() for p in date_str.strip().splitlines() if p.strip()]
+        cleaned = parts[-1]  # The date is always the last line
+
+        # Also strip any remaining status prefix (for the no-newline format)
+        for prefix in ("Published", "Scheduled", "Pending", "Draft", "Private"):
+            if cleaned.startswith(prefix):
+                cleaned = cleaned[len(prefix):].strip()
+                break
+
+        return datetime.strptime(cleaned, "%Y/%m/%d at %H:%M")
+    except Exception:
+        return None
+
+
+# ---------------- HTML PARSING ----------------
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+BLOCK_TAGS = {"div", "p", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"}
+# Text a browser doesn't show (so Selenium's .text leaves it out)
+HIDDEN_CLASSES = {"row-actions", "screen-reader-text", "hidden"}
+HIDDEN_TAGS = {"script", "style", "template"}
+
+# List cell classes -> row keys
+ORDER_LIST_COLUMNS = {
+    "title": "order_id",
+    "wpsc_first_name": "f_name",
+    "wpsc_last_name": "l_name",
+    "wpsc_email_address": "email",
+    "wpsc_total_amount": "amount",
+    "wpsc_order_status": "payment_status",
+    "date": "date",
+}
+
+
+def visible_text(chunks):
+    """Join text chunks the way a browser renders them: one line per block, spaces collapsed."""
+    lines = (" ".join(line.split()) for line in "".join(chunks).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class OrderListParser(HTMLParser):
+    """Collects the visible text of the order list's cells, one dict per iedit row."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.stack = []  # (tag, hidden)
+        self.row = None
+        self.row_depth = None
+        self.cell = None  # (key, depth, chunks)
+
+    def handle_starttag(self, tag, attrs):
+        classes = set((dict(attrs).get("class") or "").split())
+        if self.cell and tag == "br":
+            self.cell[2].append("\n")
+        if tag in VOID_TAGS:
+            return
+        hidden = bool(classes & HIDDEN_CLASSES) or tag in HIDDEN_TAGS
+        self.stack.append((tag, hidden))
+
+        if tag == "tr" and "iedit" in classes:
+            self.row = {key: None for key in ORDER_LIST_COLUMNS.values()}
+            self.row_depth = len(self.stack)
+        elif self.row is not None and self.cell is None:
+            for class_name, key in ORDER_LIST_COLUMNS.items():
+                if class_name in classes and self.row[key] is None:
+                    self.cell = (key, len(self.stack), [])
+                    break
+        elif self.cell and tag in BLOCK_TAGS:
+            self.cell[2].append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in (open_tag for open_tag, _ in self.stack):
+            return
+        while self.stack:
+            open_tag, _ = self.stack.pop()
+            if self.cell and len(self.stack) < self.cell[1]:
+                key, _, chunks = self.cell
+                self.row[key] = visible_text(chunks)
+                self.cell = None
+            if self.row is not None and len(self.stack) < self.row_depth:
+                self.rows.append(self.row)
+                self.row = None
+            if open_tag == tag:
+                break
+        if self.cell and tag in BLOCK_TAGS:
+            self.cell[2].append("\n")
+
+    def handle_data(self, data):
+        if self.cell and not any(hidden for _, hidden in self.stack):
+            self.cell[2].append(data)
+
+
+class OrderDetailParser(HTMLParser):
+    """Reads the wpsc_items_ordered textarea and the wpsc_total_amount field."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.order = None
+        self.amount = None
+        self.items_chunks = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if attrs.get("name") == "wpsc_items_ordered" and tag == "textarea":
+            self.items_chunks = []
+        elif attrs.get("name") == "wpsc_total_amount" and self.amount is None:
+            self.amount = (attrs.get("value") or "").strip()
+
+    def handle_endtag(self, tag):
+        if tag == "textarea" and self.items_chunks is not None:
+            self.order = "".join(self.items_chunks).strip()
+            self.items_chunks = None
+
+    def handle_data(self, data):
+        if self.items_chunks is not None:
+            self.items_chunks.append(data)
+
+
+def parse_order_list(html):
+    """Rows of an order list page, top to bottom; a missing cell is None."""
+    parser = OrderListParser()
+    parser.feed(html)
+    parser.close()
+    return parser.rows
+
+
+def parse_order_detail(html):
+    """(items ordered, total amount) from an order edit page, or None if they're missing."""
+    parser = OrderDetailParser()
+    parser.feed(html)
+    parser.close()
+    if parser.order is None or parser.amount is None:
+        return None
+    return parser.order, parser.amount
+
+
+# ---------------- WORDPRESS SESSION ----------------
+def login_to_wordpress():
+    """Log in to WordPress; returns a session holding the auth cookies."""
+    print("Logging in to WordPress...")
+    session = requests.Session()
+    # One keep-alive connection per detail worker
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=DETAIL_CONCURRENCY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # Sets wordpress_test_cookie, which the login form checks for
+    session.get(LOGIN_URL, timeout=REQUEST_TIMEOUT)
+    response = session.post(LOGIN_URL, data={
+        "log": WP_USERNAME,
+        "pwd": WP_PASSWORD,
+        "wp-submit": "Log In",
+        "redirect_to": PAGE_1_URL,
+        "testcookie": "1",
+    }, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+
+    if not any(cookie.name.startswith("wordpress_logged_in") for cookie in session.cookies):
+        raise RuntimeError("WordPress login failed (no logged-in cookie set)")
+    print("Logged in successfully.")
+    return session
+
+
+def fetch_order_details(session, order_ids):
+    """
+    Fetch and parse these orders' edit pages, DETAIL_CONCURRENCY at a time.
+    Returns {order_id: (order, amount)}, with None for pages that couldn't be read.
+    """
+    def fetch(order_id):
+        try:
+            response = session.get(ORDER_DETAIL_URL.format(order_id=order_id), timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            detail = parse_order_detail(response.text)
+            if detail is None:
+                print(f"  Could not get order details for {order_id}: order fields not found")
+            return detail
+        except Exception as e:
+            print(f"  Could not get order details for {order_id}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=DETAIL_CONCURRENCY) as pool:
+        return dict(zip(order_ids, pool.map(fetch, order_ids)))
+
+
+def get_last_order_from_sheet(sheet):
+    """
+    Get the last order ID AND date from the Google Sheet.
+    Returns (last_order_id_str, last_order_datetime) or (None, None).
+    """
+    try:
+        all_records = sheet.get_all_records()
+
+        if not all_records:
+            print("No existing records found in sheet. Starting fresh.")
+            return None, None
+
+        last_record = all_records[-1]
+
+        # Always compare as string to avoid int/str mismatch from gspread
+        last_order_id = str(last_record['Order ID']).strip()
+
+        # Parse date for fallback comparison
+        raw_date = str(last_record.get('Date', '')).strip()
+        last_order_date = parse_wp_date(raw_date)
+
+        print(f"Last order in sheet  ->  ID: {last_order_id}  |  Date: {raw_date}")
+        return last_order_id, last_order_date
+
+    except Exception as e:
+        print(f"Error reading from Google Sheet: {e}")
+        return None, None
+
+
+def scrape_new_orders(session, last_known_order_id, last_known_date):
+    """
+    Scrape only new orders from Page 1 (WordPress lists newest first).
+    Stops as soon as we hit an order whose ID matches last_known_order_id
+    OR whose date is <= last_known_date (whichever fires first).
+    Returns rows in CHRONOLOGICAL order (oldest-first) ready to append.
+    """
+    response = session.get(PAGE_1_URL, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    table = parse_order_list(response.text)
+    print(f"Found {len(table)} orders on page 1")
+
+    new_rows = []
+    for index, row in enumerate(table):
+        order_id = row["order_id"]
+        date_raw = row["date"]
+        order_date = parse_wp_date(date_raw)
+
+        # Stop condition 1: ID match
+        if last_known_order_id and order_id == last_known_order_id:
+            print(f"Reached last known order ID {order_id}. Stopping.")
+            break
+
+        # Stop condition 2: Date is at or before the last known date
+        if last_known_date and order_date and order_date <= last_known_date:
+            print(f"Order {order_id} date ({date_raw}) is not newer than last known. Stopping.")
+            break
+
+        if None in row.values():
+            print(f"Error processing row {index}: missing column")
+            continue
+
+        print(f"Processing new order {index + 1}: ID={order_id}  Date={date_raw}")
+        new_rows.append(row)
+
+    details = fetch_order_details(session, [row["order_id"] for row in new_rows])
+
+    new_orders_data = []
+    for row in new_rows:
+        order, amount = details[row["order_id"]] or ("N/A", "N/A")
+        new_orders_data.append(
+            [row["order_id"], row["f_name"], row["l_name"], row["email"], amount,
+             row["payment_status"], row["date"], order]
+        )
+
+    # WordPress lists newest-first; reverse so we append oldest-first (chronological)
+    new_orders_data.reverse()
+    return new_orders_data
+
+
+def append_to_sheet(sheet, new_orders_data):
+    """Append new orders to the Google Sheet in chronological order."""
+    if not new_orders_data:
+        print("No new orders to append.")
+        return
+
+    try:
+        sheet.append_rows(new_orders_data)
+        print(f"Successfully appended {len(new_orders_data)} new orders to the sheet.")
+    except Exception as e:
+        print(f"Error appending to Google Sheet: {e}")
+
+
+# ---------------- MAIN EXECUTION ----------------
+if __name__ == "__main__":
+    started = time.perf_counter()
+    sheet = open_sheet()
+
+    # Check the last order in the existing sheet (ID + date)
+    last_known_order_id, last_known_date = get_last_order_from_sheet(sheet)
+
+    print("=== CHECKING FOR NEW ORDERS ON PAGE 1 ===")
+    session = login_to_wordpress()
+    with session:
+        new_orders_data = scrape_new_orders(session, last_known_order_id, last_known_date)
+
+    if new_orders_data:
+        print(f"\nFound {len(new_orders_data)} new order(s) to append.")
+        append_to_sheet(sheet, new_orders_data)
+        print(f"\n=== UPDATE COMPLETE ===")
+    else:
+        print("\n=== NO UPDATES NEEDED ===")
+        print("No new orders found since last scrape.")
+    print(f"Finished in {time.perf_counter() - started:.1f}s")
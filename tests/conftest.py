@@ -0,0 +1,24 @@
+"""
+app.py is a Streamlit script, so importing it would render the dashboard.
+Tests load just its definitions: everything above the main application.
+"""
+import os
+import types
+from pathlib import Path
+
+import pytest
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+MAIN_MARKER = "# ====================== Main Application"
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    # Keep the mirror and the disk memo out of the working tree
+    os.environ["MIRROR_DIR"] = str(tmp_path_factory.mktemp("mirror"))
+    os.environ["MEMO_DIR"] = str(tmp_path_factory.mktemp("memo"))
+    source = APP.read_text(encoding="utf-8")
+    module = types.ModuleType("app")
+    module.__file__ = str(APP)
+    exec(compile(source[:source.index(MAIN_MARKER)], str(APP), "exec"), module.__dict__)
+    return module
@@ -0,0 +1,115 @@
+// Just enough of a page for the Buffer scraper's scripts: a timeline of
+// elements supporting the DOM calls they make. Driven over stdin/stdout, one
+// JSON command per line, so the page persists between execute_script calls.
+//   {"op": "load", "timeline": [block, ...] | null}
+//   {"op": "insert", "blocks": [block, ...], "before": index | null}
+//   {"op": "remove", "index": i}
+//   {"op": "execute", "script": "..."}   -> the script's return value
+//   {"op": "inspect"}                    -> [{scraped, children, visits}, ...]
+// A block is {"class": "...", "text": "...", "children": [block, ...], "attrs": {...}}.
+const readline = require("readline");
+
+class Element {
+    constructor(spec) {
+        this.className = spec.class || "";
+        this.text = spec.text || "";
+        this.attrs = new Map(Object.entries(spec.attrs || {}));
+        this.style = {};
+        this.parentNode = null;
+        this.childList = [];
+        this.visits = 0;
+        for (const child of spec.children || []) this.append(new Element(child));
+    }
+    append(child, before = null) {
+        child.parentNode = this;
+        const at = before === null ? this.childList.length : this.childList.indexOf(before);
+        this.childList.splice(at, 0, child);
+    }
+    remove() {
+        this.parentNode.childList.splice(this.parentNode.childList.indexOf(this), 1);
+        this.parentNode = null;
+    }
+    get children() { return this.childList; }
+    get firstElementChild() { return this.childList[0] || null; }
+    get nextElementSibling() {
+        if (!this.parentNode) return null;
+        const siblings = this.parentNode.childList;
+        return siblings[siblings.indexOf(this) + 1] || null;
+    }
+    get innerText() {
+        return [this.text, ...this.childList.map(child => child.innerText)].filter(Boolean).join("\n");
+    }
+    replaceChildren() {
+        for (const child of this.childList) child.parentNode = null;
+        this.childList = [];
+    }
+    hasAttribute(name) { this.visits += 1; return this.attrs.has(name); }
+    getAttribute(name) {
+        if (name === "class") return this.className;
+        return this.attrs.has(name) ? this.attrs.get(name) : null;
+    }
+    setAttribute(name, value) { this.attrs.set(name, value); }
+    matches(selector) {
+        // ".class" or "tag[attr]"; tags aren't modelled, so the latter matches on the attribute
+        const attr = selector.match(/\[([\w-]+)\]$/);
+        if (attr) return this.attrs.has(attr[1]);
+        return this.className.split(/\s+/).includes(selector.slice(1));
+    }
+    querySelectorAll(selector) {
+        const found = [];
+        for (const child of this.childList) {
+            if (child.matches(selector)) found.push(child);
+            found.push(...child.querySelectorAll(selector));
+        }
+        return found;
+    }
+    querySelector(selector) { return this.querySelectorAll(selector)[0] || null; }
+}
+
+const window = {};
+const document = {
+    body: {scrollHeight: 0},
+    wrapper: null,
+    querySelector(selector) {
+        return this.wrapper && this.wrapper.matches(selector) ? this.wrapper : null;
+    },
+};
+window.scrollTo = () => {};
+
+function run(command) {
+    switch (command.op) {
+        case "load":
+            document.wrapper = command.timeline === null ? null
+                : new Element({class: "publish_timeline_qL9zu", children: command.timeline});
+            for (const key of Object.keys(window)) if (key !== "scrollTo") delete window[key];
+            return null;
+        case "insert": {
+            const before = command.before === null ? null : document.wrapper.childList[command.before];
+            for (const spec of command.blocks) document.wrapper.append(new Element(spec), before);
+            return null;
+        }
+        case "remove":
+            document.wrapper.childList[command.index].remove();
+            return null;
+        case "execute":
+            return new Function("document", "window", command.script)(document, window);
+        case "inspect":
+            return document.wrapper.childList.map(block => ({
+                scraped: block.attrs.has("data-scraped"),
+                children: block.childList.length,
+                visits: block.visits,
+            }));
+    }
+    throw new Error(`unknown op ${command.op}`);
+}
+
+readline.createInterface({input: process.stdin}).on("line", line => {
+    let reply;
+    try {
+        const value = run(JSON.parse(line));
+        reply = {value: value === undefined ? null : value};
+    } catch (error) {
+        reply = {error: String(error)};
+    }
+    process.stdout.write(JSON.stringify(reply) + "\n");
+});
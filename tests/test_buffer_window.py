@@ -0,0 +1,153 @@
+"""
+The Buffer scraper's window script, run by Node against a fake timeline.
+The scraper drives a browser at import, so only its definitions are loaded.
+"""
+import ast
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRAPER = ROOT / "lpd-data-scrapers" / "All_data_buffer.py"
+FAKE_TIMELINE = Path(__file__).resolve().parent / "fixtures" / "buffer" / "fake_timeline.js"
+BROWSER_MODULES = {"selenium", "gspread", "oauth2client"}
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run the page scripts")
+
+
+@pytest.fixture(scope="module")
+def buffer():
+    """The scraper's imports, constants and functions, without its browser and sheet setup."""
+    tree = ast.parse(SCRAPER.read_text(encoding="utf-8"))
+    keep = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            keep_node = not any(alias.name.split(".")[0] in BROWSER_MODULES for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            keep_node = node.module.split(".")[0] not in BROWSER_MODULES
+        elif isinstance(node, ast.Assign):
+            keep_node = all(isinstance(target, ast.Name) and target.id.isupper() for target in node.targets)
+        else:
+            keep_node = isinstance(node, ast.FunctionDef)
+        if keep_node:
+            keep.append(node)
+    namespace = {}
+    exec(compile(ast.Module(body=keep, type_ignores=[]), str(SCRAPER), "exec"), namespace)
+    return namespace
+
+
+class FakeDriver:
+    """execute_script against a persistent fake page in a Node process."""
+
+    def __init__(self):
+        self.node = subprocess.Popen(
+            ["node", str(FAKE_TIMELINE)], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+
+    def send(self, **command):
+        self.node.stdin.write(json.dumps(command) + "\n")
+        self.node.stdin.flush()
+        reply = json.loads(self.node.stdout.readline())
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["value"]
+
+    def execute_script(self, script):
+        return self.send(op="execute", script=script)
+
+    def close(self):
+        self.node.stdin.close()
+        self.node.wait()
+
+
+@pytest.fixture
+def driver():
+    fake = FakeDriver()
+    yield fake
+    fake.close()
+
+
+def date_block(text):
+    return {"class": "publish_base_Y1USt", "text": text}
+
+
+def post_block(platform, time_text, body, likes):
+    return {"class": "publish_postContainer_aB3", "children": [
+        {"attrs": {"data-channel": platform}},
+        {"class": "publish_labelContainer_NIys3", "text": time_text},
+        {"class": "publish_body_oZVDR", "text": body},
+        {"class": "publish_wrapper_6Zayg", "children": [
+            {"class": "publish_label_79dYt", "text": "Likes"},
+            {"class": "publish_metric_3fmE3", "text": likes},
+        ]},
+    ]}
+
+
+LOADER = {"class": "publish_loading_x1", "children": [{"text": "Loading..."}]}
+
+
+def post_entry(platform, time_text, body, likes):
+    return {"type": "post", "platform": platform, "time": time_text, "body": body, "metrics": [["Likes", likes]]}
+
+
+def test_missing_timeline_is_an_empty_window(buffer, driver):
+    driver.send(op="load", timeline=None)
+    assert buffer["extract_window"](driver) == ([], 0)
+
+
+def test_windows_read_each_post_once_and_keep_only_shells(buffer, driver):
+    driver.send(op="load", timeline=[
+        date_block("Friday, 18 July"),
+        post_block("linkedin", "10:30 AM", "Court interpreting webinar", "12"),
+        post_block("facebook", "9:00 AM", "New course", "4"),
+        LOADER,
+    ])
+
+    entries, children = buffer["extract_window"](driver)
+    assert entries == [
+        {"type": "date", "text": "Friday, 18 July"},
+        post_entry("linkedin", "10:30 AM", "Court interpreting webinar", "12"),
+        post_entry("facebook", "9:00 AM", "New course", "4"),
+    ]
+    assert children == 4
+    # Read blocks are emptied to marked shells; the loading indicator is left alone
+    assert [(block["scraped"], block["children"]) for block in driver.send(op="inspect")] == [
+        (True, 0), (True, 0), (True, 0), (False, 1),
+    ]
+
+    # Older posts render above the loading indicator
+    driver.send(op="insert", before=3, blocks=[
+        date_block("Thursday, 17 July"),
+        post_block("instagram", "6:15 PM", "Ethics workbook", "30"),
+    ])
+    entries, children = buffer["extract_window"](driver)
+    assert entries == [
+        {"type": "date", "text": "Thursday, 17 July"},
+        post_entry("instagram", "6:15 PM", "Ethics workbook", "30"),
+    ]
+    assert children == 6
+    # The second pass started at the cursor, so the first window's shells weren't walked again
+    assert [block["visits"] for block in driver.send(op="inspect")] == [1, 1, 1, 1, 1, 2]
+
+
+def test_dropped_cursor_falls_back_to_skipping_shells(buffer, driver):
+    driver.send(op="load", timeline=[
+        date_block("Friday, 18 July"),
+        post_block("linkedin", "10:30 AM", "Court interpreting webinar", "12"),
+    ])
+    buffer["extract_window"](driver)
+
+    # The timeline unmounts the cursor node and renders an older post
+    driver.send(op="remove", index=1)
+    driver.send(op="insert", before=None, blocks=[post_block("facebook", "9:00 AM", "New course", "4")])
+    entries, children = buffer["extract_window"](driver)
+    assert entries == [post_entry("facebook", "9:00 AM", "New course", "4")]
+    assert children == 2
+
+
+def test_post_rows_from_window_entries(buffer):
+    row = buffer["post_row"]("Monday, 30 December 2024", post_entry("linkedin", "10:30 AM", "Hello", "12"))
+    assert row == ["30/12/2024", "10:30 AM", "linkedin", "Hello", 12, "", "", "", 0, 12]
@@ -0,0 +1,25 @@
+"""
+clean_numeric: sheet cells to floats, with anything that isn't a finite number counted as coerced.
+"""
+import pandas as pd
+
+
+def test_clean_numeric_formats(app):
+    values, coerced = app.clean_numeric(pd.Series(["£1,234.50", "$12", "1.2K", "3M", "4.5%", "-£5", "", None, 7]))
+    assert values.tolist() == [1234.5, 12.0, 1200.0, 3_000_000.0, 4.5, -5.0, 0.0, 0.0, 7.0]
+    assert not coerced.any()
+
+
+def test_non_finite_cells_are_coerced_to_zero(app):
+    cells = pd.Series([
+        "inf", "-inf", "Infinity", "nan", "NaN", "1" * 400, "9" * 308 + "M", float("inf"), "no data available",
+    ])
+    values, coerced = app.clean_numeric(cells)
+    assert values.tolist() == [0.0] * len(cells)
+    assert coerced.all()
+
+
+def test_totals_stay_finite(app):
+    values, coerced = app.clean_numeric(pd.Series(["£45.00", "inf", "£30.00"]))
+    assert values.sum() == 75.0
+    assert coerced.tolist() == [False, True, False]
@@ -0,0 +1,42 @@
+"""
+The customer index built from per-source rollups: one row per normalized email.
+"""
+import warnings
+
+import pandas as pd
+
+
+def test_customer_index_dtypes_and_totals(app):
+    rollup = pd.DataFrame({
+        "email": ["ann@example.com", "ann@example.com", "ben@example.com", "eve@example.com"],
+        "source": ["sales", "wp_sales", "sales", "wp_sales"],
+        "orders": [2, 1, 1, 3],
+        "amount": [90.0, 45.0, 30.5, 120.0],
+    })
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        customers = app.customer_index(rollup)
+
+    assert list(customers.columns) == app.CUSTOMER_COLUMNS
+    assert customers.dtypes.to_dict() == {
+        "thinkific_orders": "int32", "thinkific_spent": "float64",
+        "webinar_orders": "int32", "webinar_spent": "float64",
+        "orders": "int32", "spent": "float64",
+    }
+    assert list(customers.index) == ["ann@example.com", "eve@example.com", "ben@example.com"]
+    assert customers.loc["ann@example.com"].to_dict() == {
+        "thinkific_orders": 2, "thinkific_spent": 90.0,
+        "webinar_orders": 1, "webinar_spent": 45.0,
+        "orders": 3, "spent": 135.0,
+    }
+    assert customers.loc["ben@example.com", "webinar_orders"] == 0
+    assert customers.loc["eve@example.com", "thinkific_spent"] == 0.0
+
+
+def test_find_customer_normalizes_the_lookup(app):
+    rollup = pd.DataFrame({"email": ["ann@example.com"], "source": ["sales"], "orders": [1], "amount": [45.0]})
+    customers = app.customer_index(rollup)
+
+    assert app.find_customer(customers, " Ann+promo@Example.com ")["spent"] == 45.0
+    assert app.find_customer(customers, "nobody@example.com") is None
+    assert app.find_customer(customers, "  ") is None
@@ -0,0 +1,52 @@
+"""
+The vectorized date parsers must give exactly what their row-wise
+counterparts give, for every value in the corpus and every reference date.
+"""
+import json
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+CORPUS = json.loads((Path(__file__).resolve().parent / "fixtures" / "date_corpus.json").read_text(encoding="utf-8"))
+
+# Leap days, the days around them and year boundaries
+REFERENCE_DATES = [
+    date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1), date(2025, 2, 28), date(2025, 3, 1),
+    date(2024, 12, 31), date(2025, 1, 1), date(2025, 12, 31), date(2026, 1, 1), date(2026, 7, 15),
+]
+
+PARSERS = [
+    ("social", "parse_social_dates", "parse_social_date"),
+    ("wp_sales", "clean_wp_dates", "clean_wp_date"),
+    ("email", "parse_email_dates", "parse_email_date"),
+]
+
+
+@pytest.mark.parametrize("today", REFERENCE_DATES, ids=str)
+@pytest.mark.parametrize("source, vectorized, row_wise", PARSERS, ids=[source for source, _, _ in PARSERS])
+def test_vectorized_parser_matches_row_wise(app, source, vectorized, row_wise, today):
+    values = pd.Series(CORPUS[source], dtype=object)
+    with app.pinned_reference_date(today):
+        expected = pd.to_datetime(values.map(getattr(app, row_wise)).astype(object), errors="coerce")
+        parsed = getattr(app, vectorized)(values)
+
+    mismatches = [
+        (value, got, want)
+        for value, got, want in zip(values, parsed, expected)
+        if not (pd.isna(got) and pd.isna(want)) and got != want
+    ]
+    assert mismatches == []
+    assert parsed.dtype == "datetime64[ns]"
+    assert parsed.index.equals(values.index)
+
+
+def test_parse_cache_is_keyed_on_reference_date(app):
+    values = pd.Series(["Today", "Yesterday", "5 March"], dtype=object)
+    with app.pinned_reference_date(date(2024, 2, 29)):
+        before = app.parse_social_dates(values)
+    with app.pinned_reference_date(date(2025, 3, 6)):
+        after = app.parse_social_dates(values)
+    assert list(before) == [pd.Timestamp(2024, 2, 29), pd.Timestamp(2024, 2, 28), pd.Timestamp(2023, 3, 5)]
+    assert list(after) == [pd.Timestamp(2025, 3, 6), pd.Timestamp(2025, 3, 5), pd.Timestamp(2025, 3, 5)]
@@ -0,0 +1,106 @@
+"""
+Sheet downloads are skipped while Drive reports the same revision.
+Drive's files endpoint is replaced by a local stand-in via DRIVE_FILES_URL.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+import streamlit as st
+
+SPREADSHEET_ID = "1AbC-dEf_123"
+
+
+class DriveStandIn(BaseHTTPRequestHandler):
+    """GET /files/<id> -> the server's current version and modifiedTime."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.server.failing or not self.path.startswith(f"/files/{SPREADSHEET_ID}?"):
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({"version": str(self.server.version), "modifiedTime": "2026-10-17T09:00:00.000Z"})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+
+@pytest.fixture
+def drive(app, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DriveStandIn)
+    server.version, server.failing, server.requests = 1, False, []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(app, "DRIVE_FILES_URL", f"http://127.0.0.1:{server.server_port}/files")
+    monkeypatch.setattr(st, "secrets", {"connections": {"sales_gsheets": {
+        "spreadsheet": f"https://docs.google.com/spreadsheets/d/{SPREADSHEET_ID}/edit#gid=0",
+    }}})
+    app.get_drive_session.clear()
+    app.get_source_cache().clear()
+    stats = app.get_download_stats()
+    stats["downloaded"] = stats["skipped"] = 0
+    yield server
+    app.get_drive_session.clear()
+    server.shutdown()
+    server.server_close()
+
+
+class FakeConnection:
+    """Stands in for the GSheets connection, counting reads."""
+
+    def __init__(self):
+        self.reads = 0
+
+    def read(self, worksheet=None, ttl=None):
+        self.reads += 1
+        return pd.DataFrame({
+            "Date and Time": ["2026-10-16 10:00:00", "2026-10-15 09:30:00"],
+            "Amount": ["£45.00", "£30.00"],
+            "Email address": ["ann@example.com", "ben@example.com"],
+            "Product": ["Course", "Course"],
+        })
+
+
+def test_unchanged_revision_reuses_cached_frame(app, drive):
+    conn = FakeConnection()
+    first = app.fetch_source("sales", conn)
+    second = app.fetch_source("sales", conn)
+
+    assert conn.reads == 1
+    assert second is first
+    assert app.get_download_stats()["downloaded"] == 1
+    assert app.get_download_stats()["skipped"] == 1
+    assert app.get_source_cache()["sales"]["revision"] == "1/2026-10-17T09:00:00.000Z"
+    assert all(path.startswith(f"/files/{SPREADSHEET_ID}?") for path in drive.requests)
+
+
+def test_new_revision_downloads_again(app, drive):
+    conn = FakeConnection()
+    first = app.fetch_source("sales", conn)
+    drive.version = 2
+    second = app.fetch_source("sales", conn)
+
+    assert conn.reads == 2
+    assert second is not first
+    assert app.get_download_stats()["downloaded"] == 2
+    assert app.get_download_stats()["skipped"] == 0
+    assert app.get_source_cache()["sales"]["revision"] == "2/2026-10-17T09:00:00.000Z"
+
+
+def test_unavailable_revision_always_downloads(app, drive):
+    conn = FakeConnection()
+    drive.failing = True
+    app.fetch_source("sales", conn)
+    app.fetch_source("sales", conn)
+
+    assert conn.reads == 2
+    assert app.get_download_stats()["downloaded"] == 2
+    assert app.get_download_stats()["skipped"] == 0
+    assert app.get_source_cache()["sales"]["revision"] is None
@@ -0,0 +1,119 @@
+"""
+The event store is built from typed frames: each synced value is parsed and
+cleaned once, by typed_frame, and a restart rebuilds the same events from the mirror.
+"""
+import warnings
+from datetime import date
+
+import pandas as pd
+import pytest
+
+TODAY = date(2026, 10, 17)
+
+
+def social_sheet(rows):
+    return pd.DataFrame({
+        "Date": [f"{day}/10/2026" for day, _ in rows],
+        "Platform": ["linkedin", "facebook", "instagram"][:1] * len(rows),
+        "Post": [post for _, post in rows],
+        "Likes/Reactions": ["3", "1.2K", "no data available", "4", "0"][:len(rows)],
+        "Comments": ["1"] * len(rows),
+        "Impressions": ["100"] * len(rows),
+        "Shares": [""] * len(rows),
+        "Clicks/Eng. Rate": ["2"] * len(rows),
+        "Total Social Score": ["106"] * len(rows),
+    })
+
+
+@pytest.fixture
+def store(app, monkeypatch, tmp_path):
+    """An empty mirror, memo and event store, counting the values each parser sees."""
+    monkeypatch.setattr(app, "MIRROR_DIR", str(tmp_path / "mirror"))
+    monkeypatch.setattr(app, "MEMO_DIR", str(tmp_path / "memo"))
+    seen = {"dates": 0, "numbers": 0}
+    parse_social_dates, clean_numeric = app.parse_social_dates, app.clean_numeric
+
+    def counting_dates(values):
+        seen["dates"] += len(values)
+        return parse_social_dates(values)
+
+    def counting_numbers(values):
+        seen["numbers"] += len(values)
+        return clean_numeric(values)
+
+    monkeypatch.setattr(app, "parse_social_dates", counting_dates)
+    monkeypatch.setattr(app, "clean_numeric", counting_numbers)
+    app.get_event_store.clear()
+    app.get_typed_parts.clear()
+    with app.pinned_reference_date(TODAY):
+        yield seen
+    app.get_event_store.clear()
+    app.get_typed_parts.clear()
+
+
+def sync(app, df):
+    app.sync_mirror("social", df, app.typed_frame("social", df))
+
+
+def social_events(app):
+    events = app.refresh_event_store(TODAY)[0]
+    events = events[events["source"] == "social"].drop(columns="source")
+    return events.sort_values(["timestamp", "likes"]).reset_index(drop=True)
+
+
+def test_synced_rows_are_coerced_once(app, store):
+    first = social_sheet([(14, "a"), (15, "b"), (16, "c")])
+    sync(app, first)
+    events = social_events(app)
+    assert store == {"dates": 3, "numbers": 3 * 6}
+    assert list(events["timestamp"]) == [pd.Timestamp(f"2026-10-{day}") for day in (14, 15, 16)]
+    assert list(events["likes"]) == [3.0, 1200.0, 0.0]
+    assert list(events["coerced_cells"]) == [0, 0, 1]
+
+    # Two new rows: the new download is typed once and the event store takes its typed rows
+    second = social_sheet([(14, "a"), (15, "b"), (16, "c"), (16, "d"), (17, "e")])
+    sync(app, second)
+    events = social_events(app)
+    assert store == {"dates": 3 + 5, "numbers": (3 + 5) * 6}
+    assert len(events) == 5
+
+    expected = app.build_events({"social": app.typed_frame("social", second)}).drop(columns="source")
+    expected = expected.sort_values(["timestamp", "likes"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(events, expected)
+
+
+def test_restart_rebuilds_the_same_events_from_the_mirror(app, store):
+    sheet = social_sheet([(14, "a"), (15, "b"), (16, "c"), (16, "d")])
+    sync(app, sheet)
+    before = social_events(app)
+
+    # A new process has the mirror on disk but no stashed typed rows
+    app.get_event_store.clear()
+    app.get_typed_parts.clear()
+    pd.testing.assert_frame_equal(social_events(app), before)
+
+
+def test_typed_frame_dtypes(app, store):
+    typed = app.typed_frame("social", social_sheet([(14, "a"), (16, "c")]))
+    assert list(typed[app.COERCED_COLUMN]) == [0, 0]
+    assert typed["Likes/Reactions"].dtype == "int32"
+    assert typed["Total Social Score"].dtype == "float32"
+    assert typed["Date"].dtype == "datetime64[ns]"
+
+
+def test_empty_sources_leave_dtypes_alone(app, store):
+    sync(app, social_sheet([(14, "a"), (15, "b")]))
+    app.refresh_event_store(TODAY)
+    # After a restart the events come back from the disk memo, where empty
+    # frames lose their text columns' dtypes
+    app.get_event_store.clear()
+    app.get_typed_parts.clear()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        events, cube, customers = app.refresh_event_store(TODAY)
+
+    assert list(events["source"].unique()) == ["social"]
+    assert events["timestamp"].dtype == "datetime64[ns]"
+    assert events["amount"].dtype == "float64"
+    assert len(cube) == 2
+    assert customers.empty
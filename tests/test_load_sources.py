@@ -0,0 +1,71 @@
+"""
+Concurrent sheet loading: timeouts fall back to the last copy, and a hung read
+is never resubmitted while it is still running.
+"""
+import threading
+import time
+
+import pandas as pd
+import pytest
+import streamlit as st
+
+
+@pytest.fixture
+def sheets(app, monkeypatch):
+    """fetch_source stand-in: "sales" hangs until released, the others return at once."""
+    release = threading.Event()
+    calls = []
+
+    def fetch_source(name, conn):
+        calls.append(name)
+        if name == "sales":
+            release.wait(10)
+        df = pd.DataFrame({"source": [name], "fresh": [True]})
+        app.get_source_cache()[name] = {"df": df, "fetched_at": time.time(), "revision": None}
+        return df
+
+    monkeypatch.setattr(app, "fetch_source", fetch_source)
+    monkeypatch.setattr(st, "connection", lambda *args, **kwargs: object())
+    for name in app.DATA_SOURCES:
+        monkeypatch.setenv(f"{name.upper()}_LOAD_TIMEOUT", "0.2")
+    app.get_source_cache().clear()
+    # A stale copy of sales to fall back on
+    app.get_source_cache()["sales"] = {"df": pd.DataFrame({"source": ["sales"], "fresh": [False]}),
+                                       "fetched_at": 0, "revision": None}
+    yield calls, release
+    release.set()
+    for future in list(app.get_load_pool()["in_flight"].values()):
+        future.result(timeout=10)
+    app.get_source_cache().clear()
+
+
+def test_hung_read_is_not_resubmitted(app, sheets):
+    calls, release = sheets
+
+    frames, errors = app.load_sources()
+    assert sorted(calls) == sorted(app.DATA_SOURCES)
+    assert errors == {"sales": "timed out after 0s"}
+    assert not frames["sales"]["fresh"].iloc[0]
+    assert all(frames[name]["fresh"].iloc[0] for name in ("social", "wp_sales", "email"))
+
+    started = time.monotonic()
+    frames, errors = app.load_sources()
+    assert time.monotonic() - started < 0.2
+    assert calls.count("sales") == 1
+    assert errors == {"sales": "still loading from an earlier refresh"}
+    assert not frames["sales"]["fresh"].iloc[0]
+
+    release.set()
+    app.get_load_pool()["in_flight"]["sales"].result(timeout=10)
+    frames, errors = app.load_sources()
+    assert errors == {}
+    assert frames["sales"]["fresh"].iloc[0]
+    assert calls.count("sales") == 1
+
+
+def test_pool_threads_are_bounded(app, sheets):
+    for _ in range(5):
+        app.invalidate_sources("social", "wp_sales", "email")
+        app.load_sources()
+    workers = [thread for thread in threading.enumerate() if thread.name.startswith("load_sources")]
+    assert len(workers) <= app.MAX_LOAD_WORKERS
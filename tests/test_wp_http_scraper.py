@@ -0,0 +1,168 @@
+"""
+The browserless WordPress scraper against saved admin pages served locally.
+Expected rows are what scrapers/wp-scraper.py appends for the same pages.
+"""
+import importlib.util
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "wp"
+
+USERNAME = "admin"
+PASSWORD = "secret"
+LOGGED_IN_COOKIE = "wordpress_logged_in_0123abcd=admin%7Ctoken"
+
+
+class WordPressStandIn(BaseHTTPRequestHandler):
+    """wp-login.php, the order list and order edit pages, from the saved fixtures."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, status, body="", cookie=None, location=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        if cookie:
+            self.send_header("Set-Cookie", f"{cookie}; path=/")
+        if location:
+            self.send_header("Location", location)
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def logged_in(self):
+        return LOGGED_IN_COOKIE in (self.headers.get("Cookie") or "")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/wp-login.php":
+            self.respond(200, '<form name="loginform" id="loginform"></form>',
+                         cookie="wordpress_test_cookie=WP%20Cookie%20check")
+        elif not self.logged_in():
+            self.respond(302, location="/wp-login.php")
+        elif url.path == "/wp-admin/edit.php" and query.get("post_type") == ["wpsc_cart_orders"]:
+            self.respond(200, (FIXTURES / "orders_list.html").read_text(encoding="utf-8"))
+        elif url.path == "/wp-admin/post.php" and query.get("action") == ["edit"]:
+            page = FIXTURES / f"order_{query['post'][0]}.html"
+            if page.exists():
+                self.respond(200, page.read_text(encoding="utf-8"))
+            else:
+                self.respond(404, "Not found")
+        else:
+            self.respond(404, "Not found")
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8"))
+        if (
+            urlparse(self.path).path == "/wp-login.php"
+            and form.get("log") == [USERNAME]
+            and form.get("pwd") == [PASSWORD]
+            and "wordpress_test_cookie" in (self.headers.get("Cookie") or "")
+        ):
+            self.respond(200, "Dashboard", cookie=LOGGED_IN_COOKIE)
+        else:
+            self.respond(200, '<div id="login_error">Incorrect password.</div>')
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), WordPressStandIn)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(scope="module")
+def scraper(server):
+    saved = {name: os.environ.get(name) for name in ("WP_BASE_URL", "WP_USERNAME", "WP_PASSWORD")}
+    os.environ.update(WP_BASE_URL=server, WP_USERNAME=USERNAME, WP_PASSWORD=PASSWORD)
+    spec = importlib.util.spec_from_file_location("wp_http_scraper", ROOT / "scrapers" / "wp_http_scraper.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    for name, value in saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+@pytest.fixture
+def session(scraper):
+    with scraper.login_to_wordpress() as session:
+        yield session
+
+
+ORDER_1040 = ["1040", "Dev", "Patel", "dev@example.com", "45.00", "Paid", "Published\n2026/10/12 at 11:00",
+              "Live Webinar: Interpreting & Ethics x 1\nWorkbook (PDF) x 1"]
+ORDER_1042 = ["1042", "Ben", "Carter", "ben+webinar@example.com", "30.00", "Paid", "Published\n2026/10/15 at 09:30",
+              "Live Webinar: Court Interpreting x 1"]
+ORDER_1043 = ["1043", "Ann", "O'Neil", "ann@example.com", "45.00", "Paid", "Published\n2026/10/16 at 14:05",
+              "Live Webinar: Interpreting & Ethics x 1\nWorkbook (PDF) x 1"]
+# No edit page is saved for 1039, so its details fall back to N/A
+ORDER_1039 = ["1039", "Eve", "Stone", "eve@example.com", "N/A", "Paid", "Published\n2026/10/10 at 08:20", "N/A"]
+
+
+def test_parse_order_list_reads_visible_cell_text(scraper):
+    rows = scraper.parse_order_list((FIXTURES / "orders_list.html").read_text(encoding="utf-8"))
+
+    assert [row["order_id"] for row in rows] == ["1043", "1042", "1041", "1040", "1039"]
+    assert rows[0] == {
+        "order_id": "1043",
+        "f_name": "Ann",
+        "l_name": "O'Neil",
+        "email": "ann@example.com",
+        "amount": "£45.00",
+        "payment_status": "Paid",
+        "date": "Published\n2026/10/16 at 14:05",
+    }
+    # 1041's list row has no email cell
+    assert rows[2]["email"] is None
+
+
+def test_parse_order_detail(scraper):
+    detail = scraper.parse_order_detail((FIXTURES / "order_1042.html").read_text(encoding="utf-8"))
+    assert detail == ("Live Webinar: Court Interpreting x 1", "30.00")
+    assert scraper.parse_order_detail("<html><body>Not an order</body></html>") is None
+
+
+def test_login_sets_logged_in_cookie(scraper, session):
+    assert any(cookie.name.startswith("wordpress_logged_in") for cookie in session.cookies)
+
+
+def test_login_with_wrong_password_fails(scraper, monkeypatch):
+    monkeypatch.setattr(scraper, "WP_PASSWORD", "wrong")
+    with pytest.raises(RuntimeError):
+        scraper.login_to_wordpress()
+
+
+def test_scrape_stops_at_last_known_order_id(scraper, session):
+    # 1041 is new but has a missing cell, so it's skipped
+    assert scraper.scrape_new_orders(session, "1040", None) == [ORDER_1042, ORDER_1043]
+
+
+def test_scrape_stops_at_last_known_date(scraper, session):
+    rows = scraper.scrape_new_orders(session, None, datetime(2026, 10, 12, 11, 0))
+    assert rows == [ORDER_1042, ORDER_1043]
+
+
+def test_last_known_order_with_missing_cell_still_stops(scraper, session):
+    assert scraper.scrape_new_orders(session, "1041", None) == [ORDER_1042, ORDER_1043]
+
+
+def test_scrape_everything_on_a_fresh_sheet(scraper, session):
+    rows = scraper.scrape_new_orders(session, None, None)
+    assert rows == [ORDER_1039, ORDER_1040, ORDER_1042, ORDER_1043]
+
+
+def test_nothing_new(scraper, session):
+    assert scraper.scrape_new_orders(session, "1043", None) == []